@@ -10,7 +10,11 @@ import statistics
 import shutil
 import multiprocessing
 from pathlib import Path
-from graph import Graph
+from dense_graph import DENSE_ALGORITHMS, DENSE_THRESHOLD
+from graph_cache import load_cached_csr
+from graph_catalog import load_catalog, matches, parse_filters
+from graph_loader import open_text
+from vertex_order import ORDERS
 
 
 def detect_python_command():
@@ -46,7 +50,13 @@ def detect_python_command():
 
 
 def run_max_flow(
-    graph_path, source, sink, algorithm, mad_flow_script, python_cmd="python3"
+    graph_path,
+    source,
+    sink,
+    algorithm,
+    mad_flow_script,
+    python_cmd="python3",
+    mad_flow_args=(),
 ):
     """Run mad-flow.py on a graph and measure execution time."""
     start_time = time.perf_counter()
@@ -65,6 +75,7 @@ def run_max_flow(
                 "-a",
                 algorithm,
                 "--json",
+                *mad_flow_args,
             ],
             capture_output=True,
             text=True,
@@ -92,6 +103,54 @@ def run_max_flow(
         return None, None, f"Exception: {str(e)}"
 
 
+def run_max_flow_repeated(
+    graph_path,
+    source,
+    sink,
+    algorithm,
+    mad_flow_script,
+    num_runs,
+    python_cmd="python3",
+    mad_flow_args=(),
+):
+    """
+    Run mad-flow.py once, solving the graph num_runs times on a single load.
+    Returns the per-solve times reported by mad-flow.py (load time excluded).
+    """
+    try:
+        result = subprocess.run(
+            [
+                python_cmd,
+                mad_flow_script,
+                "-g",
+                graph_path,
+                "-s",
+                source,
+                "-t",
+                sink,
+                "-a",
+                algorithm,
+                "--json",
+                "--repeat",
+                str(num_runs),
+                *mad_flow_args,
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=3600 * num_runs,
+        )
+        output_data = json.loads(result.stdout.strip())
+        return output_data["solve_times"], output_data.get("max_flow"), None
+
+    except subprocess.TimeoutExpired:
+        return None, None, "Timeout"
+    except subprocess.CalledProcessError as e:
+        return None, None, f"Error: {e.stderr}"
+    except Exception as e:
+        return None, None, f"Exception: {str(e)}"
+
+
 def should_skip_file(filename):
     """Check if file should be skipped based on name patterns."""
     skip_patterns = ["readme", "read me", "output", "test"]
@@ -107,17 +166,23 @@ def is_valid_graph_file(file_path):
     """
     Validate that a file has proper graph format.
     Expected format: source_node destination_node weight
+    Only the first few non-blank lines are read.
     """
+    sample_size = 5
     try:
-        with open(file_path, "r") as f:
-            lines = [line.strip() for line in f if line.strip()]
+        with open_text(file_path) as f:
+            lines = []
+            for line in f:
+                if line.strip():
+                    lines.append(line.strip())
+                    if len(lines) == sample_size:
+                        break
 
             if not lines:
                 return False, "Empty file"
 
             # Check first few lines to validate format
-            sample_size = min(5, len(lines))
-            for i, line in enumerate(lines[:sample_size]):
+            for i, line in enumerate(lines):
                 fields = line.split()
                 if len(fields) < 3:
                     return False, f"Line {i+1} has fewer than 3 fields"
@@ -162,13 +227,23 @@ def process_single_graph(args_tuple):
         algorithm,
         mad_flow_script,
         python_cmd,
+        mad_flow_args,
+        cache_dir,
+        reuse_load,
+        order,
+        graph_size,
     ) = args_tuple
 
-    # Load graph and get size information
+    # Size information comes from the dataset catalog. With the binary cache
+    # the graph is loaded here once so compiling it is not counted in the
+    # first timed run.
     try:
-        graph = Graph(str(graph_file))
-        num_vertices = graph.get_num_vertices()
-        num_edges = graph.get_num_edges()
+        if cache_dir is not None:
+            graph = load_cached_csr(str(graph_file), cache_dir or None, order=order)
+            num_vertices = graph.get_num_vertices()
+            num_edges = graph.get_num_edges()
+        else:
+            num_vertices, num_edges = graph_size
     except Exception as e:
         error_msg = f"ERROR: {graph_type}/{graph_file.name} - Failed to load graph: {e}"
         print(error_msg, file=sys.stderr)
@@ -185,10 +260,37 @@ def process_single_graph(args_tuple):
     max_flow_values = []  # Track all max_flow values to verify consistency
     errors = []
 
-    for run in range(num_runs):
-        elapsed, flow, error = run_max_flow(
-            str(graph_file), source, sink, algorithm, mad_flow_script, python_cmd
+    if reuse_load:
+        # A single mad-flow.py process parses the graph once and times each solve
+        solve_times, flow, error = run_max_flow_repeated(
+            str(graph_file),
+            source,
+            sink,
+            algorithm,
+            mad_flow_script,
+            num_runs,
+            python_cmd,
+            mad_flow_args,
         )
+        if error:
+            runs = [(None, None, error)] * num_runs
+        else:
+            runs = [(elapsed, flow, None) for elapsed in solve_times]
+    else:
+        runs = (
+            run_max_flow(
+                str(graph_file),
+                source,
+                sink,
+                algorithm,
+                mad_flow_script,
+                python_cmd,
+                mad_flow_args,
+            )
+            for _ in range(num_runs)
+        )
+
+    for run, (elapsed, flow, error) in enumerate(runs):
 
         if error:
             error_msg = f"Run {run+1}: {error}"
@@ -255,10 +357,22 @@ def benchmark_graphs(
     mad_flow_script,
     num_processes,
     python_cmd="python3",
+    mad_flow_args=(),
+    cache_dir=None,
+    reuse_load=False,
+    order="file",
+    catalog=None,
+    filters=(),
 ):
-    """Benchmark all graphs in the input directory using multiprocessing."""
+    """
+    Benchmark all graphs in the input directory using multiprocessing.
+    Graphs are discovered through the dataset catalog (see graph_catalog.py)
+    and only those matching every filter term are run.
+    """
     input_path = Path(input_dir)
     output_path = Path(output_dir)
+    if catalog is None:
+        catalog = load_catalog(input_path, processes=num_processes)
 
     # Map directory names to normalized names (case insensitive, lowercase)
     type_mapping = {
@@ -296,25 +410,40 @@ def benchmark_graphs(
 
         print(f"\nCollecting {normalized_type} graphs from {subdir.name}/")
 
-        # Find all .txt files
-        graph_files = sorted([f for f in subdir.glob("*.txt")])
+        # Graph files (.txt, optionally compressed) listed in the catalog
+        entries = sorted(
+            (key, entry)
+            for key, entry in catalog.items()
+            if key.startswith(f"{subdir.name}/")
+        )
 
-        if not graph_files:
-            print(f"  No .txt files found in {subdir.name}/")
+        if not entries:
+            print(f"  No graph files found in {subdir.name}/")
             continue
 
-        for graph_file in graph_files:
+        filtered = 0
+        for key, entry in entries:
+            graph_file = input_path / key
+
             # Skip files with non-graph names
             if should_skip_file(graph_file.name):
                 print(f"  Skipping {graph_file.name} (non-graph file)")
                 continue
 
             # Validate graph file format
-            is_valid, error_msg = is_valid_graph_file(graph_file)
+            if entry["valid"]:
+                is_valid, error_msg = is_valid_graph_file(graph_file)
+            else:
+                is_valid, error_msg = False, entry["error"]
             if not is_valid:
                 print(f"  Skipping {graph_file.name} (invalid format: {error_msg})")
                 continue
 
+            # Subset selection (--where)
+            if not matches(entry, filters):
+                filtered += 1
+                continue
+
             # Add to tasks
             tasks.append(
                 (
@@ -326,6 +455,11 @@ def benchmark_graphs(
                     algorithm,
                     mad_flow_script,
                     python_cmd,
+                    mad_flow_args,
+                    cache_dir,
+                    reuse_load,
+                    order,
+                    (entry["n"], entry["m"]),
                 )
             )
 
@@ -334,6 +468,9 @@ def benchmark_graphs(
                 graph_type_info[normalized_type] = []
             graph_type_info[normalized_type].append(graph_file.name)
 
+        if filtered:
+            print(f"  {filtered} graph(s) excluded by --where")
+
     if not tasks:
         print("\nERROR: No valid graph files found to process")
         return False
@@ -513,6 +650,76 @@ def main():
         help="Path to mad-flow.py script (default: mad-flow.py)",
     )
 
+    parser.add_argument(
+        "-b",
+        "--backend",
+        type=str,
+        choices=["dict", "csr", "dense", "auto"],
+        default="dict",
+        help="Graph representation passed to mad-flow.py; auto uses the dense matrix backend for graphs whose density m/n^2 reaches --dense-threshold (default: dict)",
+    )
+
+    parser.add_argument(
+        "--dense-threshold",
+        type=float,
+        default=None,
+        help=f"Edge density from which --backend auto picks the dense backend (default: {DENSE_THRESHOLD})",
+    )
+
+    parser.add_argument(
+        "-w",
+        "--where",
+        action="append",
+        default=None,
+        help='Only benchmark graphs whose catalog entry matches, e.g. "m>50000,C<=10" (fields: n, m, C, max_capacity, density, file name parameters; may be repeated)',
+    )
+
+    parser.add_argument(
+        "--order",
+        type=str,
+        choices=ORDERS,
+        default="file",
+        help="Vertex order passed to mad-flow.py (csr/auto backends): file, bfs or rcm (default: file)",
+    )
+
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Load graphs through the binary cache (requires --backend csr)",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory for binary cache files (implies --cache)",
+    )
+
+    parser.add_argument(
+        "--no-gap",
+        action="store_true",
+        help="Preflow-push: disable the gap heuristic (mad-flow.py --no-gap)",
+    )
+
+    parser.add_argument(
+        "--no-global-relabel",
+        action="store_true",
+        help="Preflow-push: disable global relabeling (mad-flow.py --no-global-relabel)",
+    )
+
+    parser.add_argument(
+        "--global-relabel-interval",
+        type=int,
+        default=None,
+        help="Preflow-push: relabels between global relabels (default: the number of vertices)",
+    )
+
+    parser.add_argument(
+        "--reuse-load",
+        action="store_true",
+        help="Load each graph once per algorithm and time only the solves (mad-flow.py --repeat)",
+    )
+
     parser.add_argument(
         "--clean",
         action="store_true",
@@ -534,12 +741,37 @@ def main():
     print(f"Using Python command: {python_cmd}")
 
     # Determine which algorithms to benchmark
-    valid_algorithms = ["ford_fulkerson", "scaling_ford_fulkerson", "preflow_push"]
-    implemented_algorithms = [
+    valid_algorithms = [
         "ford_fulkerson",
         "scaling_ford_fulkerson",
         "preflow_push",
+        "preflow_push_fifo",
+        "preflow_push_lowest",
+        "preflow_push_excess_scaling",
+        "preflow_push_min_cut",
+        "dinic",
+        "dynamic_tree_dinic",
+        "isap",
+        "fattest_path",
+        "scaling_dinic",
+        "boykov_kolmogorov",
+        "planar_dual",
     ]
+    implemented_algorithms = [
+        "ford_fulkerson",
+        "scaling_ford_fulkerson",
+        "preflow_push",
+        "preflow_push_fifo",
+        "preflow_push_lowest",
+        "preflow_push_excess_scaling",
+        "preflow_push_min_cut",
+        "dinic",
+        "dynamic_tree_dinic",
+        "isap",
+        "fattest_path",
+        "scaling_dinic",
+        "boykov_kolmogorov",
+    ]  # planar_dual solves only Mesh graphs, so it runs when asked for with -a
 
     if args.algorithm:
         # Parse comma-separated list
@@ -570,11 +802,48 @@ def main():
         print(f"Error: Max flow script '{args.mad_flow_script}' not found")
         return 1
 
+    # Options forwarded to every mad-flow.py run
+    mad_flow_args = ["--backend", args.backend]
+    if args.backend == "dense":
+        unsupported = [a for a in algorithms if a not in DENSE_ALGORITHMS]
+        if unsupported:
+            print(f"Error: --backend dense does not support {', '.join(unsupported)}")
+            return 1
+    if args.order != "file":
+        if args.backend not in ("csr", "auto"):
+            print("Error: --order applies to the csr and auto backends")
+            return 1
+        mad_flow_args += ["--order", args.order]
+    if args.dense_threshold is not None:
+        mad_flow_args += ["--dense-threshold", str(args.dense_threshold)]
+    if args.no_gap:
+        mad_flow_args.append("--no-gap")
+    if args.no_global_relabel:
+        mad_flow_args.append("--no-global-relabel")
+    if args.global_relabel_interval is not None:
+        mad_flow_args += ["--global-relabel-interval", str(args.global_relabel_interval)]
+    cache_dir = None
+    if args.cache or args.cache_dir is not None:
+        if args.backend != "csr":
+            print("Error: --cache/--cache-dir require --backend csr")
+            return 1
+        # An empty string selects the default cache location next to each graph
+        cache_dir = args.cache_dir or ""
+        mad_flow_args.append("--cache")
+        if args.cache_dir is not None:
+            mad_flow_args += ["--cache-dir", args.cache_dir]
+
     # Validate processes
     if args.processes < 1:
         print(f"Error: Number of processes must be at least 1")
         return 1
 
+    try:
+        filters = parse_filters(args.where)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
     # Handle output directory
     if os.path.exists(args.output):
         if args.clean:
@@ -594,10 +863,18 @@ def main():
     print(f"  Algorithm(s): {', '.join(algorithms)}")
     print(f"  Algorithm script: {args.mad_flow_script}")
     print(f"  Graph types: {args.types if args.types else 'all'}")
-    print(f"  Runs per graph: {args.runs}")
+    print(f"  Backend: {args.backend}{' (binary cache)' if cache_dir is not None else ''}")
+    print(f"  Vertex order: {args.order}")
+    print(f"  Runs per graph: {args.runs}{' (single load, solve time only)' if args.reuse_load else ''}")
     print(f"  Parallel processes: {args.processes}")
     print(f"  Source node: {args.source}")
     print(f"  Sink node: {args.sink}")
+    if filters:
+        print(f"  Graph filter: {', '.join(args.where)}")
+
+    # Discover the graphs once through the dataset catalog, parsing only new
+    # or changed files
+    catalog = load_catalog(args.input, processes=args.processes)
 
     # Run benchmarks for each algorithm
     all_success = True
@@ -618,6 +895,12 @@ def main():
             args.mad_flow_script,
             args.processes,
             python_cmd,
+            mad_flow_args,
+            cache_dir,
+            args.reuse_load,
+            args.order,
+            catalog,
+            filters,
         )
 
         if not success:
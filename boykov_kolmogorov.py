@@ -0,0 +1,214 @@
+from collections import deque
+
+from csr_graph import as_residual_network
+
+# Tree membership of a vertex
+FREE = 0
+SOURCE_TREE = 1
+SINK_TREE = 2
+
+# parent_arc values that are not arcs
+ROOT = -1
+ORPHAN = -2
+
+
+def boykov_kolmogorov(graph, source, sink, stats=None):
+    # Boykov-Kolmogorov: grow a search tree from s and one into t over
+    # residual arcs until they touch, augment along the path through the
+    # touching arc, then repair the trees instead of discarding them. Only
+    # the vertices cut off by saturated tree arcs (orphans) look for a new
+    # parent, so on grids with many short paths each augmentation costs far
+    # less than a BFS over the whole graph. The bound is O(n^2 m |f|), but
+    # it is fast on low-degree grid graphs in practice.
+    # graph may be a Graph, a CSRGraph or a ResidualNetwork (reset and reused).
+    # A dict-backed Graph is converted to CSR arrays first.
+    # If stats is a dict, the augmentation and orphan counts are stored in it.
+    network = as_residual_network(graph)
+    s = network.vertex_id(source)
+    t = network.vertex_id(sink)
+    n = network.num_vertices
+    offsets = network.offsets
+    heads = network.heads
+    rev = network.rev
+    residual = network.residual
+
+    # parent_arc[v] is the tree arc between v and parent[v], directed the
+    # way flow goes: parent -> v in the source tree, v -> parent in the sink
+    # tree. stamp[v] and dist[v] cache v's distance to its root, valid if
+    # stamp[v] is the current time, so orphans prefer short new paths and
+    # do not walk to the root for every candidate parent.
+    tree = bytearray(n)
+    parent = [-1] * n
+    parent_arc = [ROOT] * n
+    stamp = [0] * n
+    dist = [0] * n
+    time = 1
+
+    tree[s] = SOURCE_TREE
+    tree[t] = SINK_TREE
+    stamp[s] = stamp[t] = time
+    active = deque([s, t])
+    is_active = bytearray(n)
+    is_active[s] = is_active[t] = 1
+    orphans = deque()
+
+    max_flow = 0
+    augmentations = 0
+    orphan_count = 0
+
+    def augment(mid):
+        # Push the bottleneck along s ~> tail(mid) -> heads[mid] ~> t and
+        # turn the vertices below saturated tree arcs into orphans
+        nonlocal max_flow, augmentations, orphan_count
+        path_flow = residual[mid]
+        v = heads[rev[mid]]
+        while v != s:
+            c = residual[parent_arc[v]]
+            if c < path_flow:
+                path_flow = c
+            v = parent[v]
+        v = heads[mid]
+        while v != t:
+            c = residual[parent_arc[v]]
+            if c < path_flow:
+                path_flow = c
+            v = parent[v]
+
+        residual[mid] -= path_flow
+        residual[rev[mid]] += path_flow
+        for v in (heads[rev[mid]], heads[mid]):
+            while parent_arc[v] >= 0:
+                a = parent_arc[v]
+                residual[a] -= path_flow
+                residual[rev[a]] += path_flow
+                u = parent[v]
+                if residual[a] == 0:
+                    parent_arc[v] = ORPHAN
+                    orphans.append(v)
+                    orphan_count += 1
+                v = u
+
+        max_flow += path_flow
+        augmentations += 1
+
+    def adopt(p):
+        # Give orphan p a new parent in its tree whose path to the root is
+        # intact, the closest one if there are several; otherwise p leaves
+        # the tree and its children become orphans in turn
+        own = tree[p]
+        best_arc = -1
+        best_dist = n
+        for a in range(offsets[p], offsets[p + 1]):
+            q = heads[a]
+            if tree[q] != own:
+                continue
+            # Arc between q and p, directed the way flow would go
+            b = rev[a] if own == SOURCE_TREE else a
+            if residual[b] == 0:
+                continue
+
+            # Walk up from q until the root, a vertex checked at this time,
+            # or an orphan
+            d = 0
+            j = q
+            while True:
+                if stamp[j] == time:
+                    d += dist[j]
+                    break
+                pa = parent_arc[j]
+                if pa == ROOT:
+                    stamp[j] = time
+                    dist[j] = 0
+                    break
+                if pa == ORPHAN:
+                    d = -1
+                    break
+                d += 1
+                j = parent[j]
+            if d < 0:
+                continue
+
+            if d < best_dist:
+                best_arc = b
+                best_dist = d
+            # Cache the distances found on the way up
+            j = q
+            while stamp[j] != time:
+                stamp[j] = time
+                dist[j] = d
+                d -= 1
+                j = parent[j]
+
+        if best_arc >= 0:
+            parent_arc[p] = best_arc
+            parent[p] = heads[rev[best_arc]] if own == SOURCE_TREE else heads[best_arc]
+            stamp[p] = time
+            dist[p] = best_dist + 1
+            return
+
+        # No valid parent: free p
+        tree[p] = FREE
+        for a in range(offsets[p], offsets[p + 1]):
+            q = heads[a]
+            if tree[q] != own:
+                continue
+            # q may grow into p again later, if it has an arc towards p
+            b = rev[a] if own == SOURCE_TREE else a
+            if residual[b] > 0 and not is_active[q]:
+                is_active[q] = 1
+                active.append(q)
+            if parent[q] == p and parent_arc[q] >= 0:
+                parent_arc[q] = ORPHAN
+                orphans.append(q)
+
+    while active:
+        p = active[0]
+        own = tree[p]
+        if own == FREE:
+            active.popleft()
+            is_active[p] = 0
+            continue
+
+        # Growth: claim free neighbors along residual arcs and look for an
+        # arc into the other tree
+        mid = -1
+        for a in range(offsets[p], offsets[p + 1]):
+            # Arc between p and q, directed the way flow would go
+            b = a if own == SOURCE_TREE else rev[a]
+            if residual[b] == 0:
+                continue
+            q = heads[a]
+            other = tree[q]
+            if other == FREE:
+                tree[q] = own
+                parent[q] = p
+                parent_arc[q] = b
+                stamp[q] = stamp[p]
+                dist[q] = dist[p] + 1
+                is_active[q] = 1
+                active.append(q)
+            elif other != own:
+                mid = b
+                break
+            elif stamp[q] <= stamp[p] and dist[q] > dist[p] and parent_arc[q] >= 0:
+                # p offers q a shorter path to the root
+                parent[q] = p
+                parent_arc[q] = b
+                stamp[q] = stamp[p]
+                dist[q] = dist[p] + 1
+
+        if mid < 0:
+            active.popleft()
+            is_active[p] = 0
+            continue
+
+        # Augment, then repair both trees; p stays first in the queue
+        time += 1
+        augment(mid)
+        while orphans:
+            adopt(orphans.popleft())
+
+    if stats is not None:
+        stats["augmentations"] = augmentations
+        stats["orphans"] = orphan_count
+    return max_flow
@@ -0,0 +1,120 @@
+from array import array
+
+
+class CapacityBuckets:
+    def __init__(self, network):
+        # Adjacency index over a residual network's arcs for capacity scaling:
+        # the arcs leaving u are grouped by floor(log2(residual capacity)), so
+        # a search with threshold delta = 2^j only enumerates buckets j and
+        # up instead of every arc of u. Arcs without residual capacity are in
+        # no bucket. augment moves the arcs it changes between buckets.
+        #
+        # buckets[u] maps a bucket number to a list of u's arcs, position[a]
+        # is a's index in its list (for O(1) swap removal) and key[a] its
+        # bucket, or -1.
+        self.network = network
+        self.num_vertices = network.num_vertices
+        self.heads = network.heads
+        self.rev = network.rev
+        self.residual = network.residual
+        self.arcs_scanned = 0
+
+        offsets = network.offsets
+        residual = network.residual
+        num_arcs = len(residual)
+        self.buckets = [{} for _ in range(self.num_vertices)]
+        self.position = array("i", bytes(4 * num_arcs))
+        self.key = array("b", bytes(num_arcs))
+        for u in range(self.num_vertices):
+            buckets = self.buckets[u]
+            for a in range(offsets[u], offsets[u + 1]):
+                k = residual[a].bit_length() - 1
+                self.key[a] = k
+                if k >= 0:
+                    arcs = buckets.setdefault(k, [])
+                    self.position[a] = len(arcs)
+                    arcs.append(a)
+
+    def update(self, u, a):
+        """Move arc a (leaving u) to the bucket of its current residual capacity."""
+        old = self.key[a]
+        new = self.residual[a].bit_length() - 1
+        if old == new:
+            return
+        buckets = self.buckets[u]
+        position = self.position
+        if old >= 0:
+            arcs = buckets[old]
+            last = arcs.pop()
+            if last != a:
+                i = position[a]
+                arcs[i] = last
+                position[last] = i
+            elif not arcs:
+                del buckets[old]
+        if new >= 0:
+            arcs = buckets.setdefault(new, [])
+            position[a] = len(arcs)
+            arcs.append(a)
+        self.key[a] = new
+
+    # BFS performs a breadth-first search over arcs with residual capacity >= capacity_threshold,
+    # enumerating only the buckets that can hold such arcs
+    # parent[v] is set to the arc used to reach v
+    # It returns True if there is a path from source 's' to sink 't', otherwise False
+    def BFS(self, s, t, parent, capacity_threshold=1):
+        heads = self.heads
+        residual = self.residual
+        buckets = self.buckets
+        j = capacity_threshold.bit_length() - 1
+        scanned = 0
+
+        visited = bytearray(self.num_vertices)
+        visited[s] = 1
+        queue = [s]
+
+        for u in queue:
+            for k, arcs in buckets[u].items():
+                if k < j:
+                    continue
+                scanned += len(arcs)
+                # Bucket j also holds arcs in [2^j, threshold) unless the
+                # threshold is a power of two
+                exact = k > j
+                for a in arcs:
+                    v = heads[a]
+                    if not visited[v] and (exact or residual[a] >= capacity_threshold):
+                        visited[v] = 1
+                        parent[v] = a
+                        if v == t:
+                            self.arcs_scanned += scanned
+                            return True
+                        queue.append(v)
+        self.arcs_scanned += scanned
+        return False
+
+    def augment(self, s, t, parent):
+        """Push the bottleneck amount along the BFS path to t and return it."""
+        heads = self.heads
+        rev = self.rev
+        residual = self.residual
+
+        path_flow = float("Inf")
+        v = t
+        while v != s:
+            a = parent[v]
+            path_flow = min(path_flow, residual[a])
+            v = heads[rev[a]]
+
+        # Update the residuals and re-bucket both arcs of every pair
+        v = t
+        while v != s:
+            a = parent[v]
+            u = heads[rev[a]]
+            residual[a] -= path_flow
+            residual[rev[a]] += path_flow
+            self.update(u, a)
+            self.update(v, rev[a])
+            v = u
+
+        return path_flow
@@ -0,0 +1,322 @@
+from array import array
+from capacity_buckets import CapacityBuckets
+from graph_formats import read_graph_file
+from vertex_order import reorder
+
+
+class CSRGraph:
+    def __init__(self, labels, tails, heads, capacities):
+        # Compact flow network with vertices interned to dense integer ids.
+        # Arcs are stored in CSR (compressed sparse row) form:
+        #   the arcs leaving vertex u are offsets[u] .. offsets[u + 1] - 1
+        #   heads[a]    -> vertex the arc a points to
+        #   capacity[a] -> original capacity of arc a
+        #   rev[a]      -> index of the arc paired with a (u->v <-> v->u)
+        # The arrays are never modified after construction; solvers keep their
+        # residual capacities in a separate ResidualNetwork.
+        # Every edge u -> v becomes a forward arc at u and a reverse arc at v.
+        # Parallel edges are merged by summing capacity, and an edge v -> u
+        # reuses the reverse arc of u -> v instead of adding a second pair.
+        self.labels = list(labels)
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        self.num_vertices = len(self.labels)
+        self.source = None  # terminals named by the file (DIMACS 'n' lines), if any
+        self.sink = None
+
+        n = self.num_vertices
+
+        # Collapse the edges into one record per unordered vertex pair.
+        # edge_pair[u * n + v] is k when u -> v is the forward side of pair k,
+        # and ~k when it was merged into the backward side of pair k.
+        edge_pair = {}
+        pair_tails = []
+        pair_heads = []
+        forward_capacity = []
+        backward_capacity = []
+        for u, v, c in zip(tails, heads, capacities):
+            key = u * n + v
+            k = edge_pair.get(key)
+            if k is None:
+                k = edge_pair.get(v * n + u)
+                if k is not None and k >= 0 and u != v:
+                    edge_pair[key] = ~k
+                    backward_capacity[k] += c
+                else:
+                    edge_pair[key] = len(pair_tails)
+                    pair_tails.append(u)
+                    pair_heads.append(v)
+                    forward_capacity.append(c)
+                    backward_capacity.append(0)
+            elif k >= 0:
+                forward_capacity[k] += c
+            else:
+                backward_capacity[~k] += c
+
+        self.num_edges = len(edge_pair)
+        m = len(pair_tails)
+
+        # Count the arcs leaving each vertex (forward and reverse) and turn the
+        # counts into offsets with a prefix sum
+        out_degree = [0] * n
+        offsets = [0] * (n + 1)
+        for u in pair_tails:
+            out_degree[u] += 1
+            offsets[u + 1] += 1
+        for v in pair_heads:
+            offsets[v + 1] += 1
+        for u in range(n):
+            offsets[u + 1] += offsets[u]
+
+        # Place each pair's forward arc and reverse arc in the slots of their
+        # tails. Forward arcs come first in every vertex's range so searches
+        # try the original edges before the (initially empty) reverse arcs.
+        forward_position = offsets[:n]
+        reverse_position = [offsets[u] + out_degree[u] for u in range(n)]
+        arc_heads = array("i", bytes(4 * 2 * m))
+        arc_rev = array("i", bytes(4 * 2 * m))
+        arc_capacity = array("q", bytes(8 * 2 * m))
+        for u, v, c_uv, c_vu in zip(
+            pair_tails, pair_heads, forward_capacity, backward_capacity
+        ):
+            a = forward_position[u]
+            forward_position[u] += 1
+            b = reverse_position[v]
+            reverse_position[v] += 1
+            arc_heads[a] = v
+            arc_heads[b] = u
+            arc_capacity[a] = c_uv
+            arc_capacity[b] = c_vu
+            arc_rev[a] = b
+            arc_rev[b] = a
+
+        self.offsets = array("q", offsets)
+        self.heads = arc_heads
+        self.rev = arc_rev
+        self.capacity = arc_capacity
+
+    @classmethod
+    def from_arrays(
+        cls, labels, offsets, heads, rev, capacity, num_edges, source=None, sink=None
+    ):
+        """
+        Wrap already-built CSR arrays (e.g. memory-mapped views) without copying.
+        """
+        graph = cls.__new__(cls)
+        graph.labels = list(labels)
+        graph.index = {label: i for i, label in enumerate(graph.labels)}
+        graph.num_vertices = len(graph.labels)
+        graph.num_edges = num_edges
+        graph.source = source
+        graph.sink = sink
+        graph.offsets = offsets
+        graph.heads = heads
+        graph.rev = rev
+        graph.capacity = capacity
+        return graph
+
+    @classmethod
+    def from_file(cls, file_path, file_format="auto", order="file"):
+        """
+        Load a graph file straight into a CSRGraph, without a dict Graph.
+        order relabels the vertices first (see vertex_order.py); the bfs order
+        starts at the file's source, or at 's'.
+        """
+        labels, tails, heads, capacities, source, sink = read_graph_file(
+            file_path, file_format
+        )
+        labels, tails, heads = reorder(
+            labels, tails, heads, order, source if source is not None else "s"
+        )
+        graph = cls(labels, tails, heads, capacities)
+        graph.source = source
+        graph.sink = sink
+        return graph
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Build a CSRGraph from a dict-of-dicts Graph."""
+        index = {label: i for i, label in enumerate(graph.graph)}
+        tails = []
+        heads = []
+        capacities = []
+        for u, adjacent in graph.graph.items():
+            for v, w in adjacent.items():
+                tails.append(index[u])
+                heads.append(index[v])
+                capacities.append(int(w))
+        csr = cls(list(index), tails, heads, capacities)
+        csr.source = graph.source
+        csr.sink = graph.sink
+        return csr
+
+    def vertex_id(self, label):
+        """Return the integer id of a vertex label."""
+        try:
+            return self.index[label]
+        except KeyError:
+            raise KeyError(f"Vertex '{label}' is not in the graph") from None
+
+    def residual_network(self):
+        """Return a new ResidualNetwork with every arc at its original capacity."""
+        return ResidualNetwork(self)
+
+    def get_num_vertices(self):
+        """Return the number of vertices in the graph."""
+        return self.num_vertices
+
+    def get_num_edges(self):
+        """Return the number of edges in the graph."""
+        return self.num_edges
+
+
+def as_residual_network(graph):
+    """
+    Return a zero-flow ResidualNetwork for a Graph, CSRGraph or ResidualNetwork.
+    A ResidualNetwork passed in is reset in place and reused.
+    """
+    if isinstance(graph, ResidualNetwork):
+        graph.reset()
+        return graph
+    return graph.residual_network()
+
+
+class ResidualNetwork:
+    def __init__(self, graph):
+        # Residual capacities for one CSRGraph. The graph itself stays
+        # untouched, so one loaded graph can back many networks and solves.
+        self.graph = graph
+        self.num_vertices = graph.num_vertices
+        self.offsets = graph.offsets
+        self.heads = graph.heads
+        self.rev = graph.rev
+        self.capacity = graph.capacity
+        self.residual = array("q")
+        self.residual.frombytes(memoryview(graph.capacity).cast("B"))
+
+    def vertex_id(self, label):
+        """Return the integer id of a vertex label."""
+        return self.graph.vertex_id(label)
+
+    def reset(self):
+        """Restore every residual capacity to the original capacity, in place."""
+        memoryview(self.residual)[:] = self.capacity
+
+    def out_capacities(self, u):
+        """Return the original capacities of the arcs leaving u."""
+        return self.capacity[self.offsets[u] : self.offsets[u + 1]]
+
+    def edge_flows(self):
+        """
+        Return the current flow as {(u, v): flow} by vertex label, for every
+        edge carrying flow. Flow on a pair of opposite edges is reported net.
+        """
+        labels = self.graph.labels
+        offsets = self.offsets
+        heads = self.heads
+        capacity = self.capacity
+        residual = self.residual
+        flows = {}
+        for u in range(self.num_vertices):
+            for a in range(offsets[u], offsets[u + 1]):
+                f = capacity[a] - residual[a]
+                if f > 0:
+                    flows[(labels[u], labels[heads[a]])] = f
+        return flows
+
+    def source_side(self, s):
+        """
+        Return the labels of the vertices reachable from s over arcs with
+        residual capacity: the source side of a minimum cut once a maximum
+        flow has been found.
+        """
+        reached = [s]
+        visited = bytearray(self.num_vertices)
+        visited[s] = 1
+        for u in reached:
+            for a in range(self.offsets[u], self.offsets[u + 1]):
+                v = self.heads[a]
+                if not visited[v] and self.residual[a] > 0:
+                    visited[v] = 1
+                    reached.append(v)
+        labels = self.graph.labels
+        return {labels[v] for v in reached}
+
+    def source_side_from_sink(self, t):
+        """
+        Return the labels of the vertices that cannot reach t over arcs with
+        residual capacity. This is the source side of a minimum cut already
+        once a maximum preflow has been found, when vertices cut off from t
+        may still hold excess.
+        """
+        offsets = self.offsets
+        heads = self.heads
+        rev = self.rev
+        residual = self.residual
+        reached = [t]
+        visited = bytearray(self.num_vertices)
+        visited[t] = 1
+        for v in reached:
+            # An arc v -> u in v's range pairs with the arc u -> v into v
+            for b in range(offsets[v], offsets[v + 1]):
+                u = heads[b]
+                if not visited[u] and residual[rev[b]] > 0:
+                    visited[u] = 1
+                    reached.append(u)
+        labels = self.graph.labels
+        return {labels[v] for v in range(self.num_vertices) if not visited[v]}
+
+    def scaling_index(self):
+        """
+        Return the searcher for capacity-scaling phases: a CapacityBuckets
+        index over the arcs, so a search skips the arcs below delta.
+        """
+        return CapacityBuckets(self)
+
+    # BFS performs a breadth-first search over arcs with residual capacity >= capacity_threshold
+    # parent[v] is set to the arc used to reach v
+    # It returns True if there is a path from source 's' to sink 't', otherwise False
+    def BFS(self, s, t, parent, capacity_threshold=1):
+        offsets = self.offsets
+        heads = self.heads
+        residual = self.residual
+
+        visited = bytearray(self.num_vertices)
+        visited[s] = 1
+        queue = [s]
+
+        for u in queue:
+            # Walk the slice of heads leaving u; a tracks the matching arc index
+            a = offsets[u]
+            for v in heads[a : offsets[u + 1]]:
+                if not visited[v] and residual[a] >= capacity_threshold:
+                    visited[v] = 1
+                    parent[v] = a
+                    if v == t:
+                        return True
+                    queue.append(v)
+                a += 1
+        return False
+
+    def augment(self, s, t, parent):
+        """Push the bottleneck amount along the BFS path to t and return it."""
+        heads = self.heads
+        rev = self.rev
+        residual = self.residual
+
+        # Find the bottleneck by walking the parent arcs back from t
+        path_flow = float("Inf")
+        v = t
+        while v != s:
+            a = parent[v]
+            path_flow = min(path_flow, residual[a])
+            v = heads[rev[a]]
+
+        # Decrease the forward residuals and increase the paired reverse residuals
+        v = t
+        while v != s:
+            a = parent[v]
+            residual[a] -= path_flow
+            residual[rev[a]] += path_flow
+            v = heads[rev[a]]
+
+        return path_flow
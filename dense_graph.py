@@ -0,0 +1,208 @@
+try:
+    import numpy as np
+except ImportError:  # optional: only the dense backend needs numpy
+    np = None
+
+from csr_graph import ResidualNetwork
+from graph_formats import read_graph_file
+
+# Edge density m / n^2 from which the auto backend picks the dense matrix
+DENSE_THRESHOLD = 0.1
+
+# Solvers that only need BFS + augment, and so can run on the dense backend
+DENSE_ALGORITHMS = ("ford_fulkerson", "scaling_ford_fulkerson")
+
+# Largest graph the auto backend stores as a matrix (two n x n int64 matrices)
+DENSE_MAX_VERTICES = 5000
+
+
+def numpy_available():
+    """Return True if numpy is installed, i.e. the dense backend can be used."""
+    return np is not None
+
+
+def edge_density(num_vertices, num_edges):
+    """Return m / n^2, the fraction of the adjacency matrix holding edges."""
+    return num_edges / (num_vertices * num_vertices) if num_vertices else 0.0
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("The dense backend requires numpy: pip3 install numpy")
+
+
+class DenseGraph:
+    def __init__(self, labels, tails, heads, capacities):
+        # Adjacency-matrix flow network for dense graphs (e.g. the 30-60%
+        # density Random graphs and the bipartite graphs): capacity[u, v] is the
+        # total capacity of the edges u -> v, so parallel edges are summed and
+        # an edge v -> u is simply the opposite matrix entry.
+        _require_numpy()
+        self.labels = list(labels)
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        self.num_vertices = len(self.labels)
+        self.source = None  # terminals named by the file (DIMACS 'n' lines), if any
+        self.sink = None
+
+        n = self.num_vertices
+        tails = np.asarray(tails, dtype=np.int64)
+        heads = np.asarray(heads, dtype=np.int64)
+        self.capacity = np.zeros((n, n), dtype=np.int64)
+        np.add.at(self.capacity, (tails, heads), np.asarray(capacities, dtype=np.int64))
+        self.num_edges = int(np.unique(tails * n + heads).size)
+
+    @classmethod
+    def from_file(cls, file_path, file_format="auto"):
+        """Load a graph file straight into a DenseGraph."""
+        labels, tails, heads, capacities, source, sink = read_graph_file(
+            file_path, file_format
+        )
+        graph = cls(labels, tails, heads, capacities)
+        graph.source = source
+        graph.sink = sink
+        return graph
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Build a DenseGraph from a dict-of-dicts Graph."""
+        index = {label: i for i, label in enumerate(graph.graph)}
+        tails = []
+        heads = []
+        capacities = []
+        for u, adjacent in graph.graph.items():
+            for v, w in adjacent.items():
+                tails.append(index[u])
+                heads.append(index[v])
+                capacities.append(int(w))
+        dense = cls(list(index), tails, heads, capacities)
+        dense.source = graph.source
+        dense.sink = graph.sink
+        return dense
+
+    def vertex_id(self, label):
+        """Return the integer id of a vertex label."""
+        try:
+            return self.index[label]
+        except KeyError:
+            raise KeyError(f"Vertex '{label}' is not in the graph") from None
+
+    def residual_network(self):
+        """Return a new DenseResidualNetwork with every arc at its original capacity."""
+        return DenseResidualNetwork(self)
+
+    def get_num_vertices(self):
+        """Return the number of vertices in the graph."""
+        return self.num_vertices
+
+    def get_num_edges(self):
+        """Return the number of edges in the graph."""
+        return self.num_edges
+
+
+class DenseResidualNetwork(ResidualNetwork):
+    def __init__(self, graph):
+        # Residual capacities of a DenseGraph as a second n x n matrix. Searches
+        # expand a whole BFS level with one matrix slice and boolean visited
+        # mask, and augmentations update the path with fancy indexing, so the
+        # per-vertex Python work of the CSR backend becomes a few array operations.
+        # There are no offsets/heads/rev arrays, so only the augmenting-path
+        # solvers (BFS + augment) run on this network.
+        self.graph = graph
+        self.num_vertices = graph.num_vertices
+        self.capacity = graph.capacity
+        self.residual = graph.capacity.copy()
+        self.predecessor = np.full(graph.num_vertices, -1, dtype=np.int64)
+
+    def reset(self):
+        """Restore every residual capacity to the original capacity, in place."""
+        np.copyto(self.residual, self.capacity)
+
+    def scaling_index(self):
+        """
+        Return self: the matrix BFS filters whole rows by the threshold, and
+        there are no arc arrays to index by capacity bucket.
+        """
+        return self
+
+    def out_capacities(self, u):
+        """Return the original capacities of the arcs leaving u."""
+        return self.capacity[u].tolist()
+
+    def edge_flows(self):
+        """
+        Return the current flow as {(u, v): flow} by vertex label, for every
+        edge carrying flow. Flow on a pair of opposite edges is reported net.
+        """
+        labels = self.graph.labels
+        flow = self.capacity - self.residual
+        tails, heads = np.nonzero(flow > 0)
+        return {
+            (labels[u], labels[v]): int(flow[u, v])
+            for u, v in zip(tails.tolist(), heads.tolist())
+        }
+
+    def source_side(self, s):
+        """
+        Return the labels of the vertices reachable from s over arcs with
+        residual capacity: the source side of a minimum cut once a maximum
+        flow has been found.
+        """
+        visited = np.zeros(self.num_vertices, dtype=bool)
+        visited[s] = True
+        frontier = np.array([s])
+        while frontier.size:
+            frontier = np.flatnonzero((self.residual[frontier] > 0).any(axis=0) & ~visited)
+            visited[frontier] = True
+        labels = self.graph.labels
+        return {labels[v] for v in np.flatnonzero(visited).tolist()}
+
+    # BFS performs a level-synchronous breadth-first search over arcs with
+    # residual capacity >= capacity_threshold. Only the vertices on the path
+    # found get parent[v] set, to the vertex v was reached from.
+    # It returns True if there is a path from source 's' to sink 't', otherwise False
+    def BFS(self, s, t, parent, capacity_threshold=1):
+        if s == t:
+            return False  # an empty path carries no flow
+        residual = self.residual
+        predecessor = self.predecessor
+
+        visited = np.zeros(self.num_vertices, dtype=bool)
+        visited[s] = True
+        frontier = np.array([s])
+
+        while frontier.size:
+            # reach[i, v]: the i-th frontier vertex has a usable arc to unvisited v
+            reach = residual[frontier] >= capacity_threshold
+            reach &= ~visited
+            found = np.flatnonzero(reach.any(axis=0))
+            if not found.size:
+                return False
+
+            # Each new vertex remembers the first frontier vertex reaching it
+            predecessor[found] = frontier[reach[:, found].argmax(axis=0)]
+            visited[found] = True
+
+            if visited[t]:
+                v = t
+                while v != s:
+                    u = int(predecessor[v])
+                    parent[v] = u
+                    v = u
+                return True
+            frontier = found
+        return False
+
+    def augment(self, s, t, parent):
+        """Push the bottleneck amount along the BFS path to t and return it."""
+        path = [t]
+        v = t
+        while v != s:
+            v = parent[v]
+            path.append(v)
+        heads = np.array(path[:-1])
+        tails = np.array(path[1:])
+
+        path_flow = int(self.residual[tails, heads].min())
+        self.residual[tails, heads] -= path_flow
+        self.residual[heads, tails] += path_flow
+        return path_flow
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+DIMACS max-flow format
+
+    c <comment>
+    p max <num_vertices> <num_arcs>
+    n <id> s
+    n <id> t
+    a <u> <v> <capacity>
+
+Vertex ids run from 1 to num_vertices. read_dimacs returns the same
+(labels, tails, heads, capacities) lists as graph_loader.read_edge_list, plus
+the source and sink labels given by the 'n' lines. write_dimacs records the
+original vertex labels in 'c vertex <id> <label>' comments, which read_dimacs
+uses when present so converted graphs keep their labels.
+
+Run as a script to convert an edge-list file into DIMACS, e.g. to cross-check
+the generated graph families against other max-flow solvers:
+
+    python3 dimacs.py GeneratedGraphs/Mesh/20r-20c-1000cap-const.txt mesh20.max
+"""
+
+import argparse
+import sys
+
+from graph_loader import CHUNK_SIZE, open_text
+
+
+def read_dimacs(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Read a DIMACS max-flow file ('-' and compressed files are accepted).
+    Returns (labels, tails, heads, capacities, source, sink).
+
+    Vertices are labelled by their ids, unless the file carries the
+    'c vertex <id> <label>' comments written by write_dimacs.
+    """
+    problem = {"n": None, "s": None, "t": None, "labels": {}}
+    tails = []
+    heads = []
+    capacities = []
+
+    with open_text(file_path) as f:
+        rest = ""
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            chunk = rest + chunk
+            cut = chunk.rfind("\n") + 1
+            rest = chunk[cut:]
+            _parse_lines(chunk[:cut].splitlines(), problem, tails, heads, capacities)
+        _parse_lines(rest.splitlines(), problem, tails, heads, capacities)
+
+    n = problem["n"]
+    if n is None:
+        raise ValueError("DIMACS file has no 'p max' problem line")
+    if problem["s"] is None or problem["t"] is None:
+        raise ValueError("DIMACS file does not name both a source and a sink")
+
+    # DIMACS ids are 1-based
+    tails = [u - 1 for u in tails]
+    heads = [v - 1 for v in heads]
+    for ids in (tails, heads):
+        if ids and (min(ids) < 0 or max(ids) >= n):
+            raise ValueError(f"An arc uses a vertex outside 1..{n}")
+
+    labels = [str(i) for i in range(1, n + 1)]
+    for i, label in problem["labels"].items():
+        if 1 <= i <= n:
+            labels[i - 1] = label
+
+    source = labels[problem["s"] - 1]
+    sink = labels[problem["t"] - 1]
+    return labels, tails, heads, capacities, source, sink
+
+
+def _parse_lines(lines, problem, tails, heads, capacities):
+    # Arc lines make up almost the whole file: split them in bulk
+    arc_lines = [line for line in lines if line.startswith("a")]
+    tokens = " ".join(arc_lines).split()
+    if len(tokens) == 4 * len(arc_lines):
+        tails.extend(map(int, tokens[1::4]))
+        heads.extend(map(int, tokens[2::4]))
+        capacities.extend(map(int, tokens[3::4]))
+    else:
+        for line in arc_lines:
+            fields = line.split()
+            if len(fields) != 4:
+                raise ValueError(f"Malformed arc line: '{line.strip()}'")
+            tails.append(int(fields[1]))
+            heads.append(int(fields[2]))
+            capacities.append(int(fields[3]))
+
+    # Problem, node descriptor and vertex label lines
+    for line in lines:
+        kind = line[:1]
+        if kind == "p":
+            fields = line.split()
+            if len(fields) != 4 or fields[1] != "max":
+                raise ValueError(f"Not a max-flow problem line: '{line.strip()}'")
+            problem["n"] = int(fields[2])
+        elif kind == "n":
+            fields = line.split()
+            if len(fields) != 3 or fields[2] not in ("s", "t"):
+                raise ValueError(f"Malformed node line: '{line.strip()}'")
+            problem[fields[2]] = int(fields[1])
+        elif line.startswith("c vertex "):
+            fields = line.split()
+            if len(fields) == 4:
+                problem["labels"][int(fields[2])] = fields[3]
+
+
+def write_dimacs(graph, file_path, source="s", sink="t", comment=None):
+    """
+    Write a Graph in DIMACS max-flow format. Vertices are numbered 1..n in the
+    graph's vertex order; the original labels are listed in 'c' comment lines.
+    """
+    ids = {label: i for i, label in enumerate(graph.graph, 1)}
+    lines = []
+    if comment:
+        lines.append(f"c {comment}")
+    lines.append(f"p max {len(ids)} {graph.get_num_edges()}")
+    lines.append(f"n {ids[source]} s")
+    lines.append(f"n {ids[sink]} t")
+    for label, i in ids.items():
+        lines.append(f"c vertex {i} {label}")
+    for u, adjacent in graph.graph.items():
+        u_id = ids[u]
+        for v, w in adjacent.items():
+            lines.append(f"a {u_id} {ids[v]} {w}")
+    lines.append("")
+
+    with open(file_path, "w") as f:
+        f.write("\n".join(lines))
+
+
+def main():
+    from graph import Graph
+
+    parser = argparse.ArgumentParser(
+        description="Convert an edge-list graph file to DIMACS max-flow format"
+    )
+    parser.add_argument("input", help="Edge-list graph file ('-' for stdin)")
+    parser.add_argument("output", help="DIMACS file to write")
+    parser.add_argument(
+        "-s", "--source", type=str, default="s", help="Source node (default: s)"
+    )
+    parser.add_argument(
+        "-t", "--sink", type=str, default="t", help="Sink node (default: t)"
+    )
+    args = parser.parse_args()
+
+    graph = Graph(args.input, file_format="edges")
+    for label in (args.source, args.sink):
+        if label not in graph.graph:
+            print(f"Error: vertex '{label}' is not in {args.input}", file=sys.stderr)
+            return 1
+
+    write_dimacs(
+        graph, args.output, args.source, args.sink, comment=f"converted from {args.input}"
+    )
+    print(
+        f"Wrote {args.output}: {graph.get_num_vertices()} vertices, {graph.get_num_edges()} arcs"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+from csr_graph import as_residual_network
+
+
+def dinic(graph, source, sink):
+    # graph may be a Graph, a CSRGraph or a ResidualNetwork (reset and reused).
+    # A dict-backed Graph is converted to CSR arrays first.
+    network = as_residual_network(graph)
+    s = network.vertex_id(source)
+    t = network.vertex_id(sink)
+    if s == t:
+        return 0  # no flow can leave and reach the same vertex
+
+    # level[v] is v's BFS distance from s in the current phase (-1: unreached)
+    level = [-1] * network.num_vertices
+    max_flow = 0
+
+    # Each phase builds the level graph and saturates it with a blocking flow;
+    # the s-t distance grows every phase, so there are at most n - 1 phases
+    while build_levels(network, s, t, level):
+        max_flow += blocking_flow(network, s, t, level)
+
+    return max_flow
+
+
+def build_levels(network, s, t, level, capacity_threshold=1):
+    """
+    Fill level with the BFS distances from s over arcs with residual capacity
+    >= capacity_threshold, stopping at t's distance. Return True if t was reached.
+    """
+    offsets = network.offsets
+    heads = network.heads
+    residual = network.residual
+
+    for v in range(len(level)):
+        level[v] = -1
+    level[s] = 0
+    queue = [s]
+
+    for u in queue:
+        next_level = level[u] + 1
+        if level[t] != -1 and next_level > level[t]:
+            break  # vertices beyond t's level cannot be on a shortest path
+        a = offsets[u]
+        for v in heads[a : offsets[u + 1]]:
+            if level[v] == -1 and residual[a] >= capacity_threshold:
+                level[v] = next_level
+                queue.append(v)
+            a += 1
+    return level[t] != -1
+
+
+def blocking_flow(network, s, t, level, capacity_threshold=1):
+    """
+    Push flow along level-graph paths (each arc going one level up, with
+    residual capacity >= capacity_threshold) until none is left, and return
+    the amount pushed.
+    """
+    offsets = network.offsets
+    heads = network.heads
+    rev = network.rev
+    residual = network.residual
+
+    # current[u] is u's current arc: arcs before it are known to be useless
+    # for the rest of the phase, so every arc is skipped at most once
+    current = list(offsets[: network.num_vertices])
+    path = []  # arcs of the partial path from s to u
+    total = 0
+    u = s
+
+    while True:
+        if u == t:
+            # Augment by the bottleneck, then retreat to the tail of the first
+            # arc that dropped below the threshold
+            path_flow = min(residual[a] for a in path)
+            for a in path:
+                residual[a] -= path_flow
+                residual[rev[a]] += path_flow
+            total += path_flow
+            for i, a in enumerate(path):
+                if residual[a] < capacity_threshold:
+                    break
+            del path[i:]
+            u = heads[path[-1]] if path else s
+            continue
+
+        # Advance along the current arc, skipping arcs outside the level graph
+        a = current[u]
+        end = offsets[u + 1]
+        next_level = level[u] + 1
+        while a < end and (
+            residual[a] < capacity_threshold or level[heads[a]] != next_level
+        ):
+            a += 1
+        current[u] = a
+
+        if a < end:
+            path.append(a)
+            u = heads[a]
+        else:
+            # Dead end: drop u from the level graph and retreat one arc
+            level[u] = -1
+            if not path:
+                return total
+            a = path.pop()
+            u = heads[rev[a]]
+            current[u] += 1
@@ -0,0 +1,257 @@
+from csr_graph import as_residual_network
+from dinic import build_levels
+
+INF = float("Inf")
+
+
+class LinkCutForest:
+    def __init__(self, num_vertices):
+        # Sleator-Tarjan dynamic trees over vertex ids 0..n-1. Each represented
+        # tree is rooted, and every non-root vertex v stores the cost of the
+        # tree edge v -> parent(v) (roots store INF). Preferred paths are kept
+        # in splay trees ordered from the root (left) down to the deepest
+        # vertex (right); par[x] is x's splay parent, or the path-parent
+        # pointer when x is the root of its splay tree. mn[x] is the minimum
+        # cost in x's splay subtree, and lazy[x] a cost change not yet passed
+        # on to x's children (x's own val and mn already include it).
+        self.left = [-1] * num_vertices
+        self.right = [-1] * num_vertices
+        self.par = [-1] * num_vertices
+        self.val = [INF] * num_vertices
+        self.mn = [INF] * num_vertices
+        self.lazy = [0] * num_vertices
+
+    def _is_splay_root(self, x):
+        p = self.par[x]
+        return p < 0 or (self.left[p] != x and self.right[p] != x)
+
+    def _update(self, x):
+        m = self.val[x]
+        c = self.left[x]
+        if c >= 0 and self.mn[c] < m:
+            m = self.mn[c]
+        c = self.right[x]
+        if c >= 0 and self.mn[c] < m:
+            m = self.mn[c]
+        self.mn[x] = m
+
+    def _push(self, x):
+        z = self.lazy[x]
+        if z:
+            for c in (self.left[x], self.right[x]):
+                if c >= 0:
+                    self.val[c] += z
+                    self.mn[c] += z
+                    self.lazy[c] += z
+            self.lazy[x] = 0
+
+    def _rotate(self, x):
+        left = self.left
+        right = self.right
+        par = self.par
+        p = par[x]
+        g = par[p]
+        if not self._is_splay_root(p):
+            if left[g] == p:
+                left[g] = x
+            else:
+                right[g] = x
+        par[x] = g
+        if left[p] == x:
+            b = right[x]
+            left[p] = b
+            right[x] = p
+        else:
+            b = left[x]
+            right[p] = b
+            left[x] = p
+        if b >= 0:
+            par[b] = p
+        par[p] = x
+        self._update(p)
+        self._update(x)
+
+    def _splay(self, x):
+        # Apply pending cost changes from the splay root down to x first
+        path = [x]
+        y = x
+        while not self._is_splay_root(y):
+            y = self.par[y]
+            path.append(y)
+        for y in reversed(path):
+            self._push(y)
+
+        left = self.left
+        while not self._is_splay_root(x):
+            p = self.par[x]
+            if not self._is_splay_root(p):
+                g = self.par[p]
+                if (left[g] == p) == (left[p] == x):
+                    self._rotate(p)  # zig-zig
+                else:
+                    self._rotate(x)  # zig-zag
+            self._rotate(x)
+
+    def _access(self, x):
+        # Make the path from x's tree root down to x preferred, with x at the
+        # root of its splay tree and nothing deeper than x on the path
+        last = -1
+        y = x
+        while y >= 0:
+            self._splay(y)
+            self.right[y] = last
+            self._update(y)
+            last = y
+            y = self.par[y]
+        self._splay(x)
+
+    def find_root(self, x):
+        """Return the root of the tree containing x."""
+        self._access(x)
+        while True:
+            self._push(x)
+            if self.left[x] < 0:
+                break
+            x = self.left[x]
+        self._splay(x)
+        return x
+
+    def path_min(self, x):
+        """Return the smallest edge cost on the path from x to its root."""
+        self._access(x)
+        return self.mn[x]
+
+    def path_add(self, x, delta):
+        """Add delta to every edge cost on the path from x to its root."""
+        self._access(x)
+        self.val[x] += delta
+        self.mn[x] += delta
+        self.lazy[x] += delta
+
+    def shallowest_min(self, x):
+        """
+        Return the vertex closest to the root whose edge has the smallest
+        cost on the path from x to its root.
+        """
+        self._access(x)
+        target = self.mn[x]
+        while True:
+            self._push(x)
+            c = self.left[x]
+            if c >= 0 and self.mn[c] == target:
+                x = c
+            elif self.val[x] == target:
+                break
+            else:
+                x = self.right[x]
+        self._splay(x)
+        return x
+
+    def link(self, x, w, cost):
+        """Make root x a child of w through an edge of the given cost."""
+        self._access(x)
+        self.val[x] = cost
+        self._update(x)
+        self.par[x] = w
+
+    def cut(self, x):
+        """Remove the edge from x to its parent and return its cost."""
+        self._access(x)
+        c = self.left[x]
+        self.left[x] = -1
+        self.par[c] = -1
+        cost = self.val[x]
+        self.val[x] = INF
+        self._update(x)
+        return cost
+
+
+def dynamic_tree_dinic(graph, source, sink):
+    # graph may be a Graph, a CSRGraph or a ResidualNetwork (reset and reused).
+    # A dict-backed Graph is converted to CSR arrays first.
+    network = as_residual_network(graph)
+    s = network.vertex_id(source)
+    t = network.vertex_id(sink)
+    if s == t:
+        return 0  # no flow can leave and reach the same vertex
+
+    level = [-1] * network.num_vertices
+    max_flow = 0
+
+    # Same phases as dinic; only the blocking flow differs
+    while build_levels(network, s, t, level):
+        max_flow += dynamic_tree_blocking_flow(network, s, t, level)
+
+    return max_flow
+
+
+def dynamic_tree_blocking_flow(network, s, t, level):
+    """
+    Blocking flow on the level graph with dynamic trees, in O(m log n).
+
+    Every vertex links to the head of its current level-graph arc, so the
+    trees grow partial paths towards t that are kept between augmentations:
+    an augmentation subtracts the bottleneck from a whole tree path in
+    O(log n) amortized and cuts only the arcs it saturates, instead of
+    re-walking the shared prefix arc by arc.
+    """
+    n = network.num_vertices
+    offsets = network.offsets
+    heads = network.heads
+    rev = network.rev
+    residual = network.residual
+
+    forest = LinkCutForest(n)
+    current = list(offsets[:n])
+    tree_arc = [-1] * n  # arc linking v to its tree parent, or -1
+    total = 0
+
+    def cut_arc(u):
+        # Remove u's tree arc and write its flow back to the residual arrays
+        a = tree_arc[u]
+        remaining = forest.cut(u)
+        residual[rev[a]] += residual[a] - remaining
+        residual[a] = remaining
+        tree_arc[u] = -1
+
+    while True:
+        v = forest.find_root(s)
+
+        if v == t:
+            # s's tree path reaches t: augment by its bottleneck, then cut
+            # the saturated arcs, nearest to t first so the rest stay on the path
+            path_flow = forest.path_min(s)
+            forest.path_add(s, -path_flow)
+            total += path_flow
+            while forest.path_min(s) == 0:
+                cut_arc(forest.shallowest_min(s))
+            continue
+
+        # Advance: link v along its current admissible arc
+        a = current[v]
+        end = offsets[v + 1]
+        next_level = level[v] + 1
+        while a < end and (residual[a] <= 0 or level[heads[a]] != next_level):
+            a += 1
+        current[v] = a
+
+        if a < end:
+            forest.link(v, heads[a], residual[a])
+            tree_arc[v] = a
+            continue
+
+        # Retreat: v is a dead end, so drop it and detach its tree children
+        if v == s:
+            break
+        level[v] = -1
+        for b in range(offsets[v], offsets[v + 1]):
+            u = heads[b]
+            if tree_arc[u] == rev[b]:
+                cut_arc(u)
+
+    # Write the flow on the arcs still in the trees back to the residual arrays
+    for u in range(n):
+        if tree_arc[u] >= 0:
+            cut_arc(u)
+
+    return total
@@ -0,0 +1,67 @@
+import heapq
+
+from csr_graph import as_residual_network
+
+
+def fattest_path(graph, source, sink, stats=None):
+    # Maximum-capacity augmenting paths: every augmentation uses the s-t path
+    # whose smallest residual capacity is largest, which needs O(m log C)
+    # augmentations. scaling_ford_fulkerson only approximates this with a
+    # threshold per phase.
+    # graph may be a Graph, a CSRGraph or a ResidualNetwork (reset and reused).
+    # A dict-backed Graph is converted to CSR arrays first.
+    # If stats is a dict, the number of augmentations is stored in it.
+    network = as_residual_network(graph)
+    s = network.vertex_id(source)
+    t = network.vertex_id(sink)
+    if s == t:
+        return 0  # no flow can leave and reach the same vertex
+
+    parent = [-1] * network.num_vertices
+    max_flow = 0
+    augmentations = 0
+
+    while widest_path(network, s, t, parent):
+        max_flow += network.augment(s, t, parent)
+        augmentations += 1
+
+    if stats is not None:
+        stats["augmentations"] = augmentations
+    return max_flow
+
+
+def widest_path(network, s, t, parent):
+    """
+    Find the s-t path with the largest bottleneck residual capacity with a
+    max-heap version of Dijkstra's algorithm. parent[v] is set to the arc
+    used to reach v. Returns True if t is reachable, otherwise False.
+    """
+    offsets = network.offsets
+    heads = network.heads
+    residual = network.residual
+
+    # width[v] is the best bottleneck found so far on a path from s to v
+    width = [0] * network.num_vertices
+    width[s] = float("Inf")
+    done = bytearray(network.num_vertices)
+    heap = [(-width[s], s)]
+
+    while heap:
+        w, u = heapq.heappop(heap)
+        if done[u]:
+            continue  # stale entry; u was settled with a wider path
+        done[u] = 1
+        if u == t:
+            return True
+        w = -w
+        a = offsets[u]
+        for v in heads[a : offsets[u + 1]]:
+            c = residual[a]
+            if c > 0 and not done[v]:
+                b = c if c < w else w
+                if b > width[v]:
+                    width[v] = b
+                    parent[v] = a
+                    heapq.heappush(heap, (-b, v))
+            a += 1
+    return False
@@ -1,9 +1,18 @@
 from graph import Graph
+from csr_graph import as_residual_network
 
 
-def ford_fulkerson(graph, source, sink):
+def ford_fulkerson(graph, source, sink, stats=None):
+    # If stats is a dict, the number of augmentations is stored in it
+    if not isinstance(graph, Graph):
+        return ford_fulkerson_csr(graph, source, sink, stats)
+
+    # Work on a copy so the loaded graph is left untouched and can be solved again
+    graph = graph.copy()
+
     parent = {}
     max_flow = 0
+    augmentations = 0
 
     # Augment the flow while there is a path from source to sink
     while graph.BFS(source, sink, parent):
@@ -17,6 +26,7 @@ def ford_fulkerson(graph, source, sink):
             s = parent[s]
 
         max_flow += path_flow  # increase overall flow by the bottleneck value
+        augmentations += 1
 
         v = sink
 
@@ -39,4 +49,27 @@ def ford_fulkerson(graph, source, sink):
             graph.graph[v][u] = str(int(graph.graph[v][u]) + path_flow)
             v = parent[v]
 
+    if stats is not None:
+        stats["augmentations"] = augmentations
+    return max_flow
+
+
+def ford_fulkerson_csr(graph, source, sink, stats=None):
+    # graph may be a Graph, a CSRGraph or a ResidualNetwork (reset and reused)
+    network = as_residual_network(graph)
+    s = network.vertex_id(source)
+    t = network.vertex_id(sink)
+
+    # parent[v] holds the arc used to reach v in the last BFS
+    parent = [-1] * network.num_vertices
+    max_flow = 0
+    augmentations = 0
+
+    # Augment the flow while there is a path from source to sink
+    while network.BFS(s, t, parent):
+        max_flow += network.augment(s, t, parent)
+        augmentations += 1
+
+    if stats is not None:
+        stats["augmentations"] = augmentations
     return max_flow
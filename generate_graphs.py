@@ -14,6 +14,8 @@ import subprocess
 import sys
 from pathlib import Path
 
+from graph_catalog import CATALOG_NAME, load_catalog
+
 
 # =============================================================================
 # Default Configuration (Phase 1 values)
@@ -601,6 +603,9 @@ Examples:
         if not generate_random_graphs(output_dir, random_params, random_sizes, n):
             all_success = False
 
+    # Index the generated files so benchmarks can select graphs without parsing them
+    catalog = load_catalog(output_dir)
+
     # Summary
     print("\n" + "=" * 60)
     if all_success:
@@ -610,6 +615,7 @@ Examples:
         # Count generated files
         total = sum(1 for _ in output_dir.rglob("*.txt"))
         print(f"  Total graphs: {total}")
+        print(f"  Catalog: {output_dir / CATALOG_NAME} ({len(catalog)} entries)")
     else:
         print("✗ Some graphs failed to generate. See errors above.")
         return 1
@@ -1,5 +1,10 @@
+from csr_graph import CSRGraph
+from graph_dataset import variant_path
+from graph_formats import read_graph_file
+
+
 class Graph:
-    def __init__(self, file_path):
+    def __init__(self, file_path=None, file_format="auto"):
         # The graph is represented as an adjacency list using a dictionary of dictionaries
         # Example structure:
         # {
@@ -10,26 +15,56 @@ class Graph:
         self.graph = {}
         self.num_vertices = 0
         self.num_edges = 0
-        self.load_graph(file_path)
+        self.source = None  # terminals named by the file (DIMACS 'n' lines), if any
+        self.sink = None
+        self._csr = None  # compact copy built on demand by residual_network()
+        if file_path is not None:
+            self.load_graph(file_path, file_format)
+
+    def load_graph(self, file_path, file_format="auto"):
+        # Parse the whole file in bulk, then build the adjacency dicts in one pass
+        labels, tails, heads, capacities, self.source, self.sink = read_graph_file(
+            file_path, file_format
+        )
+        self.load_edges(labels, tails, heads, capacities)
+
+    def load_edges(self, labels, tails, heads, capacities):
+        # Add edges given as vertex ids into labels (the lists read_graph_file
+        # returns), building the adjacency dicts in one pass
+        self._csr = None
+        adjacency = [{} for _ in labels]
+        for u, v, w in zip(tails, heads, capacities):
+            adjacent = adjacency[u]
+            v_label = labels[v]
+            if v_label in adjacent:
+                adjacent[v_label] += w  # merge parallel edges by summing capacity
+            else:
+                adjacent[v_label] = w
+                self.num_edges += 1
 
-    def load_graph(self, file_path):
-        with open(file_path, "r") as f:
-            for line in f:
-                fields = line.strip().split()
-                u = fields[0]  # source node
-                v = fields[1]  # destination node
-                w = fields[2]  # weight
-                self.add_edge(u, v, w)
+        for label, adjacent in zip(labels, adjacency):
+            self.graph[label] = adjacent
+        self.num_vertices += len(labels)
+
+    def load_variant(self, dataset_dir, variant):
+        # Rebuild one capacity variant of a topology + capacity-overlay dataset
+        # (see graph_dataset.py): the shared arc list plus that variant's capacities
+        self.load_graph(variant_path(dataset_dir, variant), "overlay")
 
     def add_edge(self, u, v, w):
+        self._csr = None
         if u not in self.graph:
             self.graph[u] = {}
             self.num_vertices += 1
         if v not in self.graph:
             self.graph[v] = {}
             self.num_vertices += 1
-        self.graph[u][v] = w  # edge from u to v with weight w
-        self.num_edges += 1
+        if v in self.graph[u]:
+            # Parallel edge: merge it into the existing one by summing capacity
+            self.graph[u][v] = int(self.graph[u][v]) + int(w)
+        else:
+            self.graph[u][v] = w  # edge from u to v with weight w
+            self.num_edges += 1
 
     # BFS performs a breadth-first search to find an augmenting path
     # It returns True if there is a path from source 's' to sink 't', otherwise False
@@ -55,6 +90,29 @@ class Graph:
                         return True
         return False
 
+    def to_csr(self):
+        """Return a compact integer-indexed CSRGraph copy of this graph."""
+        return CSRGraph.from_graph(self)
+
+    def residual_network(self):
+        """
+        Return a fresh ResidualNetwork for this graph. The CSR copy it is built
+        on is created once and shared by every later call.
+        """
+        if self._csr is None:
+            self._csr = self.to_csr()
+        return self._csr.residual_network()
+
+    def copy(self):
+        """Return a copy whose adjacency dicts can be modified without touching this graph."""
+        other = Graph()
+        other.graph = {u: dict(adjacent) for u, adjacent in self.graph.items()}
+        other.num_vertices = self.num_vertices
+        other.num_edges = self.num_edges
+        other.source = self.source
+        other.sink = self.sink
+        return other
+
     def get_num_vertices(self):
         """Return the number of vertices in the graph."""
         return self.num_vertices
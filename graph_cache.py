@@ -0,0 +1,186 @@
+"""
+Binary graph cache
+
+Compiles an edge-list text file into a packed binary CSR file that can be
+memory-mapped with zero copy. Layout (native byte order, sections 8-byte aligned):
+
+    header   magic, byte order, n, num_edges, num_arcs, label table size,
+             source/sink vertex ids (-1 if the file names none), source hash
+    labels   UTF-8 vertex labels separated by newlines
+    offsets  int64[n + 1]
+    heads    int32[num_arcs]
+    rev      int32[num_arcs]
+    capacity int64[num_arcs]
+
+Cache files are keyed by a BLAKE2b hash of the text file's content, so an edited
+graph file is recompiled automatically and several processes mapping the same
+cache file share its pages.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from pathlib import Path
+
+from csr_graph import CSRGraph
+from graph_formats import detect_format
+
+MAGIC = b"MADFLOW\x02"
+HEADER = struct.Struct("=8s8sQQQQqq32s")
+CACHE_SUFFIX = ".csr"
+DEFAULT_CACHE_DIR_NAME = ".mad-flow-cache"
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_digest(file_path):
+    """Return the hex BLAKE2b digest of a file's content."""
+    h = hashlib.blake2b(digest_size=32)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _cache_prefix(file_path, file_format, order):
+    return f"{Path(file_path).name}-{file_format}-{order}-"
+
+
+def cache_path_for(file_path, digest, cache_dir=None, file_format="edges", order="file"):
+    """Return where the compiled form of file_path with the given digest lives."""
+    if cache_dir is None:
+        cache_dir = Path(file_path).parent / DEFAULT_CACHE_DIR_NAME
+    name = f"{_cache_prefix(file_path, file_format, order)}{digest[:16]}{CACHE_SUFFIX}"
+    return Path(cache_dir) / name
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def write_binary(graph, path, digest):
+    """Write a CSRGraph to path in the binary cache format (atomically)."""
+    labels = "\n".join(graph.labels).encode("utf-8")
+    num_arcs = len(graph.heads)
+    header = HEADER.pack(
+        MAGIC,
+        sys.byteorder.encode("ascii").ljust(8, b"\0"),
+        graph.num_vertices,
+        graph.num_edges,
+        num_arcs,
+        len(labels),
+        graph.index[graph.source] if graph.source is not None else -1,
+        graph.index[graph.sink] if graph.sink is not None else -1,
+        bytes.fromhex(digest),
+    )
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write to a temporary file and rename it so concurrent readers never see
+    # a partially written cache file
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(labels)
+            for section in (graph.offsets, graph.heads, graph.rev, graph.capacity):
+                f.write(b"\0" * (_align(f.tell()) - f.tell()))
+                f.write(memoryview(section).cast("B"))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_binary(path, digest=None):
+    """
+    Memory-map a binary cache file and return a CSRGraph viewing its arrays.
+
+    Returns None if the file is not a valid cache file for this machine, or if
+    digest is given and does not match the hash recorded in the file.
+    """
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None  # empty file
+
+    if len(mapped) < HEADER.size:
+        return None
+    (
+        magic,
+        byteorder,
+        n,
+        num_edges,
+        num_arcs,
+        labels_size,
+        source,
+        sink,
+        stored,
+    ) = HEADER.unpack_from(mapped)
+    if magic != MAGIC or byteorder.rstrip(b"\0").decode("ascii") != sys.byteorder:
+        return None
+    if digest is not None and stored.hex() != digest:
+        return None
+
+    view = memoryview(mapped)
+    position = HEADER.size
+    labels = bytes(view[position : position + labels_size]).decode("utf-8")
+    position += labels_size
+
+    sections = []
+    for fmt, count in (("q", n + 1), ("i", num_arcs), ("i", num_arcs), ("q", num_arcs)):
+        position = _align(position)
+        size = count * struct.calcsize(fmt)
+        if position + size > len(mapped):
+            return None  # truncated file
+        sections.append(view[position : position + size].cast(fmt))
+        position += size
+
+    offsets, heads, rev, capacity = sections
+    labels = labels.split("\n") if n else []
+    return CSRGraph.from_arrays(
+        labels,
+        offsets,
+        heads,
+        rev,
+        capacity,
+        num_edges,
+        labels[source] if source >= 0 else None,
+        labels[sink] if sink >= 0 else None,
+    )
+
+
+def load_cached_csr(file_path, cache_dir=None, file_format="auto", order="file"):
+    """
+    Return a CSRGraph for a graph file, compiling it into the binary
+    cache on first use and memory-mapping the cached copy afterwards.
+    Each vertex order is cached separately.
+    """
+    if str(file_path) == "-":
+        raise ValueError("Standard input cannot be loaded through the binary cache")
+
+    if file_format == "auto":
+        file_format = detect_format(file_path)
+    digest = file_digest(file_path)
+    path = cache_path_for(file_path, digest, cache_dir, file_format, order)
+
+    if path.exists():
+        graph = read_binary(path, digest)
+        if graph is not None:
+            return graph
+
+    graph = CSRGraph.from_file(file_path, file_format, order)
+    write_binary(graph, path, digest)
+
+    # Drop compiled copies of older versions of the same file
+    prefix = _cache_prefix(file_path, file_format, order)
+    for stale in path.parent.glob(f"{prefix}*{CACHE_SUFFIX}"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+
+    return read_binary(path, digest)
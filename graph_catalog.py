@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Dataset catalog
+
+Keeps a catalog.json index in a dataset root (e.g. GeneratedGraphs/) with one
+entry per graph file in its type directories:
+
+    type            type directory (Bipartite, FixedDegree, Mesh, Random)
+    size, mtime_ns  file size and modification time, used to spot changes
+    hash            BLAKE2b hash of the file content
+    valid, error    whether the file parses as a graph, and why not
+    n, m            vertices and (distinct) edges
+    C               total capacity leaving the source
+    max_capacity    largest edge capacity
+    density         m / n^2
+    out_degree      min / max / mean out-degree
+    params          parameters parsed from the file name, e.g. rows/cols/capacity
+
+generate_graphs.py writes the catalog after generating, and load_catalog
+refreshes it lazily: only files whose size or modification time changed are
+parsed again. Benchmark discovery and subset selection then read the
+catalog instead of the graph files:
+
+    python3 graph_catalog.py GeneratedGraphs --where "m>50000,C<=10"
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+from graph_cache import file_digest
+from graph_formats import read_graph_file
+from graph_loader import COMPRESSED_SUFFIXES
+
+CATALOG_NAME = "catalog.json"
+CATALOG_VERSION = 1
+
+# Graph files picked up from each type directory (plain or compressed text)
+GRAPH_FILE_PATTERNS = ["*.txt"] + [f"*.txt{suffix}" for suffix in COMPRESSED_SUFFIXES]
+
+# File name tokens written by generate_graphs.py, e.g. 200r-200c-1000cap-const
+PARAM_NAMES = {
+    "r": "rows",
+    "c": "cols",
+    "cap": "capacity",
+    "s": "left",
+    "t": "right",
+    "p": "probability",
+    "min": "min_cap",
+    "max": "max_cap",
+    "v": "vertices",
+    "out": "edges_per_node",
+    "d": "density_percent",
+}
+PARAM_TOKEN = re.compile(r"^(\d+)([a-z]+)$")
+
+FILTER_TERM = re.compile(r"^\s*([A-Za-z_]\w*)\s*(<=|>=|==|!=|<|>|=)\s*(.+?)\s*$")
+
+
+def parse_filename_params(file_name):
+    """
+    Return the generator parameters encoded in a graph file name, e.g.
+    {'rows': 200, 'cols': 200, 'capacity': 1000, 'capacity_type': 'const'}.
+    The probability is kept as written ('05' for p=0.5), since the digits
+    alone do not say where the decimal point was.
+    """
+    stem = file_name.split(".")[0]
+    params = {}
+    for token in stem.split("-"):
+        match = PARAM_TOKEN.match(token)
+        if match:
+            digits, suffix = match.groups()
+            name = PARAM_NAMES.get(suffix, suffix)
+            params[name] = digits if suffix == "p" else int(digits)
+        elif token in ("const", "rand"):
+            params["capacity_type"] = token
+    return params
+
+
+def graph_metadata(file_path, source="s"):
+    """Parse a graph file once and return its catalog metrics."""
+    labels, tails, heads, capacities, file_source, _ = read_graph_file(file_path)
+    if file_source is not None:
+        source = file_source
+
+    # Merge parallel edges like the loaders do
+    n = len(labels)
+    merged = {}
+    for u, v, c in zip(tails, heads, capacities):
+        key = u * n + v
+        merged[key] = merged.get(key, 0) + c
+
+    out_degree = [0] * n
+    total_source_capacity = 0
+    s = labels.index(source) if source in labels else -1
+    for key, c in merged.items():
+        u = key // n
+        out_degree[u] += 1
+        if u == s:
+            total_source_capacity += c
+
+    m = len(merged)
+    return {
+        "n": n,
+        "m": m,
+        "C": total_source_capacity,
+        "max_capacity": max(merged.values(), default=0),
+        "density": m / (n * n) if n else 0.0,
+        "out_degree": {
+            "min": min(out_degree, default=0),
+            "max": max(out_degree, default=0),
+            "mean": m / n if n else 0.0,
+        },
+    }
+
+
+def _catalog_entry(job):
+    # Worker: build the entry of one file (runs in a process pool)
+    path, graph_type, stat = job
+    entry = {
+        "type": graph_type,
+        "size": stat[0],
+        "mtime_ns": stat[1],
+        "hash": file_digest(path),
+        "params": parse_filename_params(Path(path).name),
+    }
+    try:
+        entry.update(graph_metadata(path))
+        entry["valid"] = True
+    except Exception as e:
+        entry["valid"] = False
+        entry["error"] = str(e)
+    return entry
+
+
+def _read_catalog(root):
+    try:
+        with open(Path(root) / CATALOG_NAME) as f:
+            catalog = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if catalog.get("version") != CATALOG_VERSION:
+        return {}
+    return catalog.get("graphs", {})
+
+
+def _write_catalog(root, graphs):
+    # Write to a temporary file and rename it so readers never see a partial catalog
+    root = Path(root)
+    data = {"version": CATALOG_VERSION, "graphs": graphs}
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=root, suffix=".tmp")
+    except OSError:
+        return  # read-only dataset: keep the refreshed catalog in memory only
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=1)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, root / CATALOG_NAME)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_catalog(root, refresh=True, processes=None):
+    """
+    Return the catalog of a dataset root as {relative path: entry}.
+
+    With refresh, new and changed graph files are (re)parsed, in parallel
+    when processes > 1, entries of deleted files are dropped, and the catalog
+    file is rewritten if anything changed.
+    """
+    root = Path(root)
+    graphs = _read_catalog(root)
+    if not refresh:
+        return graphs
+
+    found = {}
+    jobs = []
+    for subdir in sorted(p for p in root.iterdir() if p.is_dir()):
+        for pattern in GRAPH_FILE_PATTERNS:
+            for path in subdir.glob(pattern):
+                key = path.relative_to(root).as_posix()
+                st = path.stat()
+                entry = graphs.get(key)
+                if (
+                    entry is not None
+                    and entry.get("size") == st.st_size
+                    and entry.get("mtime_ns") == st.st_mtime_ns
+                ):
+                    found[key] = entry
+                else:
+                    jobs.append((key, (str(path), subdir.name, (st.st_size, st.st_mtime_ns))))
+
+    changed = bool(jobs) or len(found) != len(graphs)
+    if jobs:
+        if processes and processes > 1 and len(jobs) > 1:
+            with multiprocessing.Pool(processes=min(processes, len(jobs))) as pool:
+                entries = pool.map(_catalog_entry, [job for _, job in jobs])
+        else:
+            entries = [_catalog_entry(job) for _, job in jobs]
+        for (key, _), entry in zip(jobs, entries):
+            found[key] = entry
+
+    found = dict(sorted(found.items()))
+    if changed:
+        _write_catalog(root, found)
+    return found
+
+
+def parse_filters(expressions):
+    """
+    Parse filter expressions such as "m>50000,C<=10" (terms separated by
+    commas; several expressions are combined) into (field, op, value) terms.
+    """
+    terms = []
+    for expression in expressions or []:
+        for term in expression.split(","):
+            if not term.strip():
+                continue
+            match = FILTER_TERM.match(term)
+            if not match:
+                raise ValueError(f"Cannot parse filter term '{term.strip()}'")
+            field, op, value = match.groups()
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+            terms.append((field, "==" if op == "=" else op, value))
+    return terms
+
+
+def matches(entry, terms):
+    """Return True if a catalog entry satisfies every filter term."""
+    for field, op, value in terms:
+        actual = entry.get(field, entry.get("params", {}).get(field))
+        if actual is None:
+            return False
+        if isinstance(value, float):
+            try:
+                actual = float(actual)
+            except (TypeError, ValueError):
+                return False
+        else:
+            actual = str(actual).lower()
+            value = value.lower()
+        if not {
+            "<": actual < value,
+            "<=": actual <= value,
+            ">": actual > value,
+            ">=": actual >= value,
+            "==": actual == value,
+            "!=": actual != value,
+        }[op]:
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build, refresh and query the catalog of a graph dataset"
+    )
+    parser.add_argument("root", help="Dataset root with graph type subdirectories")
+    parser.add_argument(
+        "-w",
+        "--where",
+        action="append",
+        help='Only list graphs matching e.g. "m>50000,C<=10" (fields: n, m, C, max_capacity, density, type, file name parameters)',
+    )
+    parser.add_argument(
+        "-p", "--processes", type=int, default=None, help="Processes used to parse new files"
+    )
+    args = parser.parse_args()
+
+    try:
+        terms = parse_filters(args.where)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    graphs = load_catalog(args.root, processes=args.processes or multiprocessing.cpu_count())
+    print(f"{'graph':<50} {'n':>8} {'m':>9} {'C':>9} {'max cap':>8}")
+    for key, entry in graphs.items():
+        if not entry["valid"]:
+            if not terms:
+                print(f"{key:<50} invalid: {entry['error']}")
+            continue
+        if matches(entry, terms):
+            print(
+                f"{key:<50} {entry['n']:>8} {entry['m']:>9} {entry['C']:>9} {entry['max_capacity']:>8}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Topology + capacity-overlay datasets
+
+Graph families that differ only in their capacities (e.g. the Phase 1 and
+Phase 3 Mesh graphs) are stored as one topology file plus one compact
+capacity vector per variant:
+
+    <dataset>/topology.topo   vertex labels, terminals and the arc list
+    <dataset>/<variant>.cap   capacities of the arcs, in topology order
+
+Both files are binary (native byte order, sections 8-byte aligned):
+
+    topology.topo  header  magic, byte order, n, m, label table size,
+                           source/sink vertex ids (-1 if none), topology hash
+                   labels  UTF-8 vertex labels separated by newlines
+                   tails   int32[m]
+                   heads   int32[m]
+
+    <variant>.cap  header  magic, byte order, m, typecode, topology hash
+                   values  capacity[m], stored in the narrowest integer
+                           type that holds them (1 byte for the 10cap graphs)
+
+The arc list is kept exactly as it appears in the source files (parallel
+edges included), so a variant rebuilds the same graph as its text file. A
+capacity file records the hash of its topology and is rejected if the
+topology next to it does not match.
+
+Pack existing graph files that share one arc list into a dataset, e.g.
+
+    python3 graph_dataset.py pack Datasets/Mesh-200r-200c \\
+        Analysis/GeneratedGraphs/Mesh/200r-200c-1000cap-const.txt \\
+        Analysis/GeneratedGraphs3/Mesh/200r-200c-10cap-const.txt
+
+and load a variant with Graph().load_variant(dataset_dir, variant) or by
+passing its .cap file to mad-flow.py.
+"""
+
+import argparse
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+
+TOPOLOGY_NAME = "topology.topo"
+CAPACITY_SUFFIX = ".cap"
+
+TOPOLOGY_MAGIC = b"MFTOPO\x00\x01"
+CAPACITY_MAGIC = b"MFCAP\x00\x00\x01"
+TOPOLOGY_HEADER = struct.Struct("=8s8sQQQqq32s")
+CAPACITY_HEADER = struct.Struct("=8s8sQ8s32s")
+
+# Capacity vector types, narrowest first
+CAPACITY_TYPECODES = ("b", "h", "i", "q")
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _byteorder():
+    return sys.byteorder.encode("ascii").ljust(8, b"\0")
+
+
+def topology_digest(labels, tails, heads):
+    """Return the hex BLAKE2b hash identifying an arc list and its labels."""
+    h = hashlib.blake2b(digest_size=32)
+    h.update("\n".join(labels).encode("utf-8"))
+    h.update(memoryview(array("i", tails)).cast("B"))
+    h.update(memoryview(array("i", heads)).cast("B"))
+    return h.hexdigest()
+
+
+def variant_path(dataset_dir, variant):
+    """Return the capacity file of a variant in a dataset directory."""
+    return Path(dataset_dir) / f"{variant}{CAPACITY_SUFFIX}"
+
+
+def list_variants(dataset_dir):
+    """Return the names of the capacity variants stored in a dataset directory."""
+    return sorted(p.stem for p in Path(dataset_dir).glob(f"*{CAPACITY_SUFFIX}"))
+
+
+def _write_atomic(path, sections):
+    # Write to a temporary file and rename it so readers never see a partial file
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for section in sections:
+                f.write(b"\0" * (_align(f.tell()) - f.tell()))
+                f.write(section)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_topology(dataset_dir, labels, tails, heads, source=None, sink=None):
+    """Write the topology file of a dataset and return its hash."""
+    labels = list(labels)
+    digest = topology_digest(labels, tails, heads)
+    index = {label: i for i, label in enumerate(labels)}
+    label_bytes = "\n".join(labels).encode("utf-8")
+    header = TOPOLOGY_HEADER.pack(
+        TOPOLOGY_MAGIC,
+        _byteorder(),
+        len(labels),
+        len(tails),
+        len(label_bytes),
+        index[source] if source is not None else -1,
+        index[sink] if sink is not None else -1,
+        bytes.fromhex(digest),
+    )
+    _write_atomic(
+        Path(dataset_dir) / TOPOLOGY_NAME,
+        [
+            header + label_bytes,
+            memoryview(array("i", tails)).cast("B"),
+            memoryview(array("i", heads)).cast("B"),
+        ],
+    )
+    return digest
+
+
+def write_capacities(dataset_dir, variant, capacities, digest):
+    """Write one variant's capacity vector for the topology with the given hash."""
+    low = min(capacities, default=0)
+    high = max(capacities, default=0)
+    for typecode in CAPACITY_TYPECODES:
+        bits = 8 * array(typecode).itemsize
+        if -(1 << (bits - 1)) <= low and high < 1 << (bits - 1):
+            break
+    values = array(typecode, capacities)
+    header = CAPACITY_HEADER.pack(
+        CAPACITY_MAGIC,
+        _byteorder(),
+        len(values),
+        typecode.encode("ascii").ljust(8, b"\0"),
+        bytes.fromhex(digest),
+    )
+    _write_atomic(variant_path(dataset_dir, variant), [header, memoryview(values).cast("B")])
+
+
+def read_topology(topology_path):
+    """
+    Read a topology file. Returns (labels, tails, heads, source, sink, digest)
+    with tails/heads as int32 arrays of vertex ids into labels.
+    """
+    with open(topology_path, "rb") as f:
+        data = f.read()
+
+    if len(data) < TOPOLOGY_HEADER.size:
+        raise ValueError(f"{topology_path} is not a topology file")
+    magic, byteorder, n, m, labels_size, source, sink, digest = (
+        TOPOLOGY_HEADER.unpack_from(data)
+    )
+    if magic != TOPOLOGY_MAGIC:
+        raise ValueError(f"{topology_path} is not a topology file")
+    if byteorder.rstrip(b"\0").decode("ascii") != sys.byteorder:
+        raise ValueError(f"{topology_path} was written on a machine with another byte order")
+
+    position = TOPOLOGY_HEADER.size
+    labels = data[position : position + labels_size].decode("utf-8")
+    labels = labels.split("\n") if n else []
+    position += labels_size
+
+    sections = []
+    for _ in range(2):
+        position = _align(position)
+        section = array("i")
+        section.frombytes(data[position : position + 4 * m])
+        if len(section) != m:
+            raise ValueError(f"{topology_path} is truncated")
+        sections.append(section)
+        position += 4 * m
+    tails, heads = sections
+
+    return (
+        labels,
+        tails,
+        heads,
+        labels[source] if source >= 0 else None,
+        labels[sink] if sink >= 0 else None,
+        digest.hex(),
+    )
+
+
+def read_capacities(capacity_path):
+    """Read a capacity file. Returns (capacities, topology hash)."""
+    with open(capacity_path, "rb") as f:
+        data = f.read()
+
+    if len(data) < CAPACITY_HEADER.size:
+        raise ValueError(f"{capacity_path} is not a capacity file")
+    magic, byteorder, m, typecode, digest = CAPACITY_HEADER.unpack_from(data)
+    if magic != CAPACITY_MAGIC:
+        raise ValueError(f"{capacity_path} is not a capacity file")
+    if byteorder.rstrip(b"\0").decode("ascii") != sys.byteorder:
+        raise ValueError(f"{capacity_path} was written on a machine with another byte order")
+
+    capacities = array(typecode.rstrip(b"\0").decode("ascii"))
+    position = _align(CAPACITY_HEADER.size)
+    capacities.frombytes(data[position : position + m * capacities.itemsize])
+    if len(capacities) != m:
+        raise ValueError(f"{capacity_path} is truncated")
+    return capacities, digest.hex()
+
+
+def read_overlay(capacity_path, topology_path=None):
+    """
+    Rebuild one variant from its capacity file and the dataset's topology
+    (topology.topo next to the capacity file unless given).
+
+    Returns (labels, tails, heads, capacities, source, sink) like
+    graph_formats.read_graph_file.
+    """
+    capacity_path = Path(capacity_path)
+    if topology_path is None:
+        topology_path = capacity_path.parent / TOPOLOGY_NAME
+
+    labels, tails, heads, source, sink, digest = read_topology(topology_path)
+    capacities, capacity_digest = read_capacities(capacity_path)
+    if capacity_digest != digest:
+        raise ValueError(f"{capacity_path} does not belong to the topology {topology_path}")
+    return labels, tails, heads, capacities, source, sink
+
+
+def pack_dataset(dataset_dir, graph_files, file_format="auto"):
+    """
+    Store graph files that share one arc list as a dataset: the topology once
+    and a capacity vector per file, named after the file. Files can be added
+    to an existing dataset later. Raises ValueError if a file's arcs differ.
+    """
+    from graph_formats import read_graph_file, variant_name
+
+    dataset_dir = Path(dataset_dir)
+    topology_path = dataset_dir / TOPOLOGY_NAME
+    digest = read_topology(topology_path)[5] if topology_path.exists() else None
+
+    variants = []
+    for graph_file in graph_files:
+        labels, tails, heads, capacities, source, sink = read_graph_file(
+            graph_file, file_format
+        )
+        if digest is None:
+            digest = write_topology(dataset_dir, labels, tails, heads, source, sink)
+        elif topology_digest(labels, tails, heads) != digest:
+            raise ValueError(f"{graph_file} does not have the dataset's arc list")
+
+        variant = variant_name(graph_file)
+        write_capacities(dataset_dir, variant, capacities, digest)
+        variants.append(variant)
+    return variants
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Store graphs that share an arc list as one topology plus capacity vectors"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pack = commands.add_parser("pack", help="Add graph files to a dataset directory")
+    pack.add_argument("dataset", help="Dataset directory (created if needed)")
+    pack.add_argument("graphs", nargs="+", help="Graph files with identical arc lists")
+    pack.add_argument(
+        "-f", "--format", default="auto", help="Graph file format (default: auto)"
+    )
+
+    show = commands.add_parser("list", help="List the variants of a dataset")
+    show.add_argument("dataset", help="Dataset directory")
+
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        try:
+            variants = pack_dataset(args.dataset, args.graphs, args.format)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        for variant in variants:
+            print(f"Stored {variant_path(args.dataset, variant)}")
+        return 0
+
+    labels, tails, _, source, sink, _ = read_topology(Path(args.dataset) / TOPOLOGY_NAME)
+    terminals = f", source {source}, sink {sink}" if source is not None else ""
+    print(f"Topology: {len(labels)} vertices, {len(tails)} arcs{terminals}")
+    for variant in list_variants(args.dataset):
+        print(f"  {variant}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
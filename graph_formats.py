@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from dimacs import read_dimacs
+from graph_dataset import CAPACITY_SUFFIX, read_overlay
+from graph_loader import COMPRESSED_SUFFIXES, read_edge_list
+
+FILE_FORMATS = ["auto", "edges", "dimacs", "overlay"]
+
+# File extensions treated as DIMACS when the format is "auto"
+DIMACS_SUFFIXES = (".max", ".dimacs")
+
+
+def _strip_compression(name):
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def detect_format(file_path):
+    """Guess a graph file's format from its name, ignoring compression suffixes."""
+    name = str(file_path).lower()
+    if name.endswith(CAPACITY_SUFFIX):
+        return "overlay"
+    return "dimacs" if _strip_compression(name).endswith(DIMACS_SUFFIXES) else "edges"
+
+
+def variant_name(file_path):
+    """Return a graph file's name without its format and compression suffixes."""
+    return Path(_strip_compression(Path(file_path).name)).stem
+
+
+def read_graph_file(file_path, file_format="auto"):
+    """
+    Read a graph file in the given format ("auto", "edges", "dimacs", or
+    "overlay" for a capacity variant of a topology dataset).
+
+    Returns (labels, tails, heads, capacities, source, sink). source and sink are
+    the terminal labels named by the file, or None for plain edge lists.
+    """
+    if file_format == "auto":
+        file_format = detect_format(file_path)
+
+    if file_format == "edges":
+        return (*read_edge_list(file_path), None, None)
+    if file_format == "dimacs":
+        return read_dimacs(file_path)
+    if file_format == "overlay":
+        return read_overlay(file_path)
+    raise ValueError(f"Unknown graph file format '{file_format}'")
@@ -0,0 +1,118 @@
+import bz2
+import gzip
+import io
+import lzma
+import sys
+
+CHUNK_SIZE = 1 << 22  # characters read from the file per chunk (~4 MB)
+
+# Compressed formats recognised by file extension
+COMPRESSED_SUFFIXES = (".gz", ".xz", ".bz2", ".zst")
+
+
+def open_text(file_path):
+    """
+    Open a graph file for reading as text.
+
+    '-' reads standard input, and .gz/.xz/.bz2/.zst files are decompressed
+    on the fly while streaming (.zst needs the optional 'zstandard' package).
+    """
+    file_path = str(file_path)
+    if file_path == "-":
+        # Reopen the descriptor so the caller's 'with' block leaves stdin open
+        return open(sys.stdin.fileno(), "r", closefd=False)
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, "rt")
+    if file_path.endswith(".xz"):
+        return lzma.open(file_path, "rt")
+    if file_path.endswith(".bz2"):
+        return bz2.open(file_path, "rt")
+    if file_path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(
+                "Reading .zst files requires the 'zstandard' package: pip3 install zstandard"
+            ) from None
+        raw = open(file_path, "rb")
+        stream = zstandard.ZstdDecompressor().stream_reader(
+            raw, read_across_frames=True, closefd=True
+        )
+        return io.TextIOWrapper(stream)
+    return open(file_path, "r")
+
+
+def read_edge_list(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Read a 'u v capacity' edge-list file in large chunks. file_path may be
+    '-' for standard input or a compressed file (see open_text).
+
+    Vertex labels are interned in order of first appearance and capacities are
+    parsed to integers once. Leading/trailing whitespace (e.g. the tab-indented
+    lines written by the bipartite generator) and blank lines are ignored.
+
+    Returns (labels, tails, heads, capacities) where tails/heads hold vertex ids
+    into labels. Parallel edges are returned as they appear in the file.
+    """
+    index = {}
+    tails = []
+    heads = []
+    capacities = []
+
+    with open_text(file_path) as f:
+        rest = ""
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+
+            # Only parse complete lines; carry the partial last line forward
+            chunk = rest + chunk
+            cut = chunk.rfind("\n") + 1
+            if cut == 0:
+                rest = chunk
+                continue
+            rest = chunk[cut:]
+            _parse_chunk(chunk[:cut], index, tails, heads, capacities)
+
+        if rest:
+            _parse_chunk(rest, index, tails, heads, capacities)
+
+    return list(index), tails, heads, capacities
+
+
+def _parse_chunk(chunk, index, tails, heads, capacities):
+    # Fast path: every line holds exactly three fields. A NUL token marks each
+    # line end, so the split keeps the line structure: if every fourth token
+    # is a mark, no long line can make up for a short or blank one
+    marked = chunk if chunk.endswith("\n") else chunk + "\n"
+    tokens = marked.replace("\n", " \0 ").split()
+    lines = len(tokens) // 4
+    if (
+        "\0" not in chunk
+        and len(tokens) == 4 * lines
+        and tokens[3::4] == ["\0"] * lines
+    ):
+        del tokens[3::4]
+        capacities.extend(map(int, tokens[2::3]))
+        del tokens[2::3]
+    else:
+        # Slow path for blank lines or lines with extra fields
+        tokens = []
+        for line in chunk.splitlines():
+            fields = line.split()
+            if not fields:
+                continue
+            if len(fields) < 3:
+                raise ValueError(f"Line '{line.strip()}' has fewer than 3 fields")
+            tokens.append(fields[0])
+            tokens.append(fields[1])
+            capacities.append(int(fields[2]))
+
+    # tokens now alternates u, v, u, v, ...; intern the new labels in order
+    for label in dict.fromkeys(tokens):
+        if label not in index:
+            index[label] = len(index)
+    ids = list(map(index.__getitem__, tokens))
+    tails.extend(ids[0::2])
+    heads.extend(ids[1::2])
@@ -0,0 +1,196 @@
+"""
+Graph reduction before solving
+
+Shrinks an edge list (as returned by graph_formats.read_graph_file) without
+changing its maximum s-t flow:
+
+    1. self-loops and zero-capacity edges are dropped, and parallel edges are
+       merged by summing their capacities
+    2. vertices not reachable from s, or from which t cannot be reached, are
+       dropped with their edges; no s-t path uses them
+    3. series chains u -> v -> w through a vertex with exactly one incoming
+       and one outgoing edge are contracted into one arc u -> w with capacity
+       min(c(u,v), c(v,w)), merged with an existing u -> w arc if there is one
+
+The Reduction keeps how every reduced arc was assembled, so a flow found on
+the reduced graph maps back onto the original edges (edge_flows), and from
+there to a minimum cut of the original graph (min_cut).
+"""
+
+
+class Reduction:
+    def __init__(self, labels, tails, heads, capacities, source, sink):
+        labels = list(labels)
+        index = {label: i for i, label in enumerate(labels)}
+        for label in (source, sink):
+            if label not in index:
+                raise KeyError(f"Vertex '{label}' is not in the graph")
+        n = len(labels)
+        s = index[source]
+        t = index[sink]
+
+        self.original_labels = labels
+        self.source = source
+        self.sink = sink
+        self.stats = {
+            "vertices_before": n,
+            "edges_before": len(tails),
+            "parallel_edges_merged": 0,
+            "edges_dropped": 0,
+            "vertices_dropped": 0,
+            "chains_contracted": 0,
+        }
+
+        # 1. Merge parallel edges, drop self-loops and empty edges
+        out = [{} for _ in range(n)]
+        for u, v, c in zip(tails, heads, capacities):
+            if u == v or c <= 0:
+                self.stats["edges_dropped"] += 1
+                continue
+            adjacent = out[u]
+            if v in adjacent:
+                adjacent[v] += c
+                self.stats["parallel_edges_merged"] += 1
+            else:
+                adjacent[v] = c
+        self._original = [dict(adjacent) for adjacent in out]
+
+        into = [{} for _ in range(n)]
+        for u in range(n):
+            for v, c in out[u].items():
+                into[v][u] = c
+
+        # 2. Keep the vertices on some s-t path (s and t are always kept)
+        keep = bytearray(a & b for a, b in zip(_reach(out, s), _reach(into, t)))
+        keep[s] = keep[t] = 1
+        for u in range(n):
+            if keep[u]:
+                out[u] = {v: c for v, c in out[u].items() if keep[v]}
+                into[u] = {v: c for v, c in into[u].items() if keep[v]}
+            else:
+                out[u] = {}
+                into[u] = {}
+        self.stats["vertices_dropped"] = n - sum(keep)
+
+        # 3. Contract series chains. parts[(u, w)] records how a contracted arc
+        # was built; arcs without an entry are original edges.
+        parts = {}
+
+        def part(u, v):
+            return parts.pop((u, v), None) or ("edge", out[u][v], u, v)
+
+        pending = [
+            v
+            for v in range(n)
+            if keep[v] and v != s and v != t and len(into[v]) == 1 and len(out[v]) == 1
+        ]
+        while pending:
+            v = pending.pop()
+            if not keep[v] or len(into[v]) != 1 or len(out[v]) != 1:
+                continue
+            (u, c_in), = into[v].items()
+            (w, c_out), = out[v].items()
+            first = part(u, v)
+            second = part(v, w)
+            del out[u][v]
+            del into[w][v]
+            out[v] = {}
+            into[v] = {}
+            keep[v] = 0
+            self.stats["chains_contracted"] += 1
+
+            if u != w:  # a chain u -> v -> u is a cycle and carries no s-t flow
+                c = min(c_in, c_out)
+                chain = ("series", c, first, second)
+                if w in out[u]:
+                    parts[(u, w)] = ("parallel", out[u][w] + c, part(u, w), chain)
+                    out[u][w] += c
+                    into[w][u] += c
+                else:
+                    parts[(u, w)] = chain
+                    out[u][w] = c
+                    into[w][u] = c
+            for x in (u, w):
+                if x != s and x != t:
+                    pending.append(x)
+
+        # Compact the remaining vertices, keeping their file order
+        kept = [u for u in range(n) if keep[u]]
+        new_id = {u: i for i, u in enumerate(kept)}
+        self.labels = [labels[u] for u in kept]
+        self.tails = []
+        self.heads = []
+        self.capacities = []
+        self._parts = {}
+        for u in kept:
+            for v, c in out[u].items():
+                self.tails.append(new_id[u])
+                self.heads.append(new_id[v])
+                self.capacities.append(c)
+                if (u, v) in parts:
+                    self._parts[(labels[u], labels[v])] = parts[(u, v)]
+
+        self.stats["vertices_after"] = len(self.labels)
+        self.stats["edges_after"] = len(self.tails)
+
+    def edge_flows(self, reduced_flows):
+        """
+        Map a flow on the reduced graph ({(u, v): flow} by label, as returned
+        by ResidualNetwork.edge_flows) onto the original edges. Parallel edges
+        of the file appear as one merged edge.
+        """
+        labels = self.original_labels
+        flows = {}
+
+        def spread(part, f):
+            kind = part[0]
+            if kind == "edge":
+                key = (labels[part[2]], labels[part[3]])
+                flows[key] = flows.get(key, 0) + f
+            elif kind == "series":
+                spread(part[2], f)
+                spread(part[3], f)
+            else:
+                # Fill the parallel branches one after the other
+                for branch in part[2:]:
+                    g = min(f, branch[1])
+                    if g > 0:
+                        spread(branch, g)
+                    f -= g
+
+        for (u, v), f in reduced_flows.items():
+            if f > 0:
+                if (u, v) in self._parts:
+                    spread(self._parts[(u, v)], f)
+                else:
+                    flows[(u, v)] = flows.get((u, v), 0) + f
+        return flows
+
+    def min_cut(self, flows):
+        """
+        Return the source side of a minimum cut of the original graph: the
+        vertices reachable from s in its residual graph under flows (a maximum
+        flow from edge_flows).
+        """
+        labels = self.original_labels
+        index = {label: i for i, label in enumerate(labels)}
+        residual = [dict(adjacent) for adjacent in self._original]
+        for (u, v), f in flows.items():
+            i, j = index[u], index[v]
+            residual[i][j] -= f
+            residual[j][i] = residual[j].get(i, 0) + f
+        reached = _reach(residual, index[self.source])
+        return {labels[u] for u in range(len(labels)) if reached[u]}
+
+
+def _reach(adjacency, start):
+    # Mark the vertices reachable from start over arcs with positive capacity
+    reached = bytearray(len(adjacency))
+    reached[start] = 1
+    queue = [start]
+    for u in queue:
+        for v, c in adjacency[u].items():
+            if c > 0 and not reached[v]:
+                reached[v] = 1
+                queue.append(v)
+    return reached
@@ -0,0 +1,105 @@
+from csr_graph import as_residual_network
+
+
+def isap(graph, source, sink):
+    # Improved shortest augmenting path. Like ford_fulkerson it augments
+    # along shortest residual paths, but instead of a BFS per path it keeps
+    # distance labels d[v] (a lower bound on v's residual distance to t) and
+    # repairs them locally: a vertex with no admissible arc (d[u] = d[v] + 1)
+    # is relabeled in place and the search retreats one arc.
+    # graph may be a Graph, a CSRGraph or a ResidualNetwork (reset and reused).
+    # A dict-backed Graph is converted to CSR arrays first.
+    network = as_residual_network(graph)
+    s = network.vertex_id(source)
+    t = network.vertex_id(sink)
+    if s == t:
+        return 0  # no flow can leave and reach the same vertex
+    n = network.num_vertices
+    offsets = network.offsets
+    heads = network.heads
+    rev = network.rev
+    residual = network.residual
+
+    d = distance_labels(network, t)
+
+    # count[h] is the number of vertices with label h, for the gap heuristic
+    count = [0] * (n + 1)
+    for h in d:
+        count[h] += 1
+
+    current = list(offsets[:n])
+    path = []  # arcs of the partial path from s to u
+    max_flow = 0
+    u = s
+
+    while d[s] < n:
+        if u == t:
+            # Augment by the bottleneck and retreat to the tail of the first
+            # saturated arc
+            path_flow = min(residual[a] for a in path)
+            for a in path:
+                residual[a] -= path_flow
+                residual[rev[a]] += path_flow
+            max_flow += path_flow
+            for i, a in enumerate(path):
+                if residual[a] == 0:
+                    break
+            del path[i:]
+            u = heads[path[-1]] if path else s
+            continue
+
+        # Advance along the current arc if it is admissible
+        a = current[u]
+        end = offsets[u + 1]
+        target = d[u] - 1
+        while a < end and (residual[a] == 0 or d[heads[a]] != target):
+            a += 1
+        current[u] = a
+        if a < end:
+            path.append(a)
+            u = heads[a]
+            continue
+
+        # Relabel u to one above its lowest residual neighbor
+        h = n - 1
+        for a in range(offsets[u], end):
+            if residual[a] > 0 and d[heads[a]] < h:
+                h = d[heads[a]]
+        count[d[u]] -= 1
+        if count[d[u]] == 0:
+            # Gap: no vertex is left at u's level, so nothing at or above it,
+            # s included, can reach t any more
+            break
+        d[u] = h + 1
+        count[d[u]] += 1
+        current[u] = offsets[u]
+
+        # Retreat one arc
+        if path:
+            u = heads[rev[path.pop()]]
+
+    return max_flow
+
+
+def distance_labels(network, t):
+    """
+    Return the exact residual distance from every vertex to t, found by a
+    reverse BFS from t; vertices that cannot reach t get num_vertices.
+    """
+    n = network.num_vertices
+    offsets = network.offsets
+    heads = network.heads
+    rev = network.rev
+    residual = network.residual
+
+    d = [n] * n
+    d[t] = 0
+    queue = [t]
+    for v in queue:
+        # An arc v -> u in v's range pairs with the arc u -> v into v
+        for b in range(offsets[v], offsets[v + 1]):
+            u = heads[b]
+            if d[u] == n and residual[rev[b]] > 0:
+                d[u] = d[v] + 1
+                queue.append(u)
+    return d
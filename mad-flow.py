@@ -1,45 +1,185 @@
 import argparse
 import json
 import sys
+import time
 from graph import Graph
+from csr_graph import CSRGraph
+from dense_graph import (
+    DENSE_ALGORITHMS,
+    DENSE_MAX_VERTICES,
+    DENSE_THRESHOLD,
+    DenseGraph,
+    edge_density,
+    numpy_available,
+)
+from mesh_graph import MeshGraph
+from graph_cache import load_cached_csr
+from graph_formats import FILE_FORMATS, read_graph_file
+from graph_reduction import Reduction
 from ford_fulkerson import ford_fulkerson
-from scaling_ford_fulkerson import scaling_max_flow
+from scaling_ford_fulkerson import scaling_dinic, scaling_max_flow
 from preflow_push import preflow_push
+from dinic import dinic
+from dynamic_tree_dinic import dynamic_tree_dinic
+from isap import isap
+from fattest_path import fattest_path
+from boykov_kolmogorov import boykov_kolmogorov
+from planar_dual import planar_dual_min_cut
+from vertex_order import ORDERS, reorder
 
 
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser()
 
-    parser.add_argument(
+    input_group = parser.add_mutually_exclusive_group(required=True)
+
+    input_group.add_argument(
         "-g", "--graph",
         type=str,
-        required=True,
-        help="Path to the graph file"
+        help="Path to the graph file ('-' reads stdin; .gz/.xz/.bz2/.zst files are decompressed while loading)"
+    )
+
+    input_group.add_argument(
+        "--mesh",
+        type=int,
+        nargs=3,
+        metavar=("ROWS", "COLS", "CAPACITY"),
+        help="Solve an implicit ROWS x COLS mesh (as from MeshGenerator.java) with constant edge capacity, without a graph file"
+    )
+
+    parser.add_argument(
+        "--mesh-random",
+        action="store_true",
+        help="Draw the --mesh edge capacities uniformly from 1..CAPACITY instead"
+    )
+
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for --mesh-random"
+    )
+
+    parser.add_argument(
+        "-f", "--format",
+        type=str,
+        choices=FILE_FORMATS,
+        default="auto",
+        help="Graph file format: 'edges' (u v capacity lines), 'dimacs', or 'overlay' (a dataset variant's .cap file) (default: auto, by file extension)"
     )
 
     parser.add_argument(
         "-s", "--source",
         type=str,
-        default="s",
-        help="Source node (default: 's')"
+        default=None,
+        help="Source node (default: the file's source for DIMACS, otherwise 's')"
     )
 
     parser.add_argument(
         "-t", "--sink",
         type=str,
-        default="t",
-        help="Sink node (default: 't')"
+        default=None,
+        help="Sink node (default: the file's sink for DIMACS, otherwise 't')"
     )
 
     parser.add_argument(
         "-a", "--algorithm",
         type=str,
-        choices=["ford_fulkerson", "scaling_ford_fulkerson", "preflow_push"],
+        choices=[
+            "ford_fulkerson",
+            "scaling_ford_fulkerson",
+            "preflow_push",
+            "preflow_push_fifo",
+            "preflow_push_lowest",
+            "preflow_push_excess_scaling",
+            "preflow_push_min_cut",
+            "dinic",
+            "dynamic_tree_dinic",
+            "isap",
+            "fattest_path",
+            "scaling_dinic",
+            "boykov_kolmogorov",
+            "planar_dual",
+        ],
         default="ford_fulkerson",
         help="Max-flow algorithm to use (default: ford_fulkerson)"
     )
 
+    parser.add_argument(
+        "--no-gap",
+        action="store_true",
+        help="Preflow-push: disable the gap heuristic"
+    )
+
+    parser.add_argument(
+        "--no-global-relabel",
+        action="store_true",
+        help="Preflow-push: disable periodic global relabeling"
+    )
+
+    parser.add_argument(
+        "--global-relabel-interval",
+        type=int,
+        default=None,
+        help="Preflow-push: relabels between global relabels (default: the number of vertices)"
+    )
+
+    parser.add_argument(
+        "-b", "--backend",
+        type=str,
+        choices=["dict", "csr", "dense", "auto"],
+        default="dict",
+        help="Graph representation the solver runs on: dict, csr, dense (NumPy adjacency matrix), or auto (dense when the edge density m/n^2 reaches --dense-threshold, otherwise csr) (default: dict)"
+    )
+
+    parser.add_argument(
+        "--dense-threshold",
+        type=float,
+        default=DENSE_THRESHOLD,
+        help=f"Edge density m/n^2 from which --backend auto picks the dense backend (default: {DENSE_THRESHOLD})"
+    )
+
+    parser.add_argument(
+        "--order",
+        type=str,
+        choices=ORDERS,
+        default="file",
+        help="Relabel vertices before building the compact arrays: file (as read), bfs (from the source) or rcm (reverse Cuthill-McKee) (default: file; csr and auto backends)"
+    )
+
+    parser.add_argument(
+        "--reduce",
+        action="store_true",
+        help="Before solving, drop vertices off every s-t path, merge parallel edges and contract series chains"
+    )
+
+    parser.add_argument(
+        "--cut",
+        action="store_true",
+        help="Also report the source side of a minimum cut (not for the dict backend)"
+    )
+
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Load the graph through the binary cache (requires --backend csr)"
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory for binary cache files (default: .mad-flow-cache next to the graph; implies --cache)"
+    )
+
+    parser.add_argument(
+        "-r", "--repeat",
+        type=int,
+        default=1,
+        help="Solve the loaded graph this many times (default: 1); per-solve times are included in JSON output"
+    )
+
     parser.add_argument(
         "--json",
         action="store_true",
@@ -48,19 +188,179 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
+    if args.cache_dir is not None:
+        args.cache = True
+    if args.cache and args.backend != "csr":
+        parser.error("--cache/--cache-dir require --backend csr")
+    if args.cache and args.mesh:
+        parser.error("--cache/--cache-dir cannot be used with --mesh")
+    if args.mesh_random and not args.mesh:
+        parser.error("--mesh-random requires --mesh")
+    if args.cache and args.graph == "-":
+        parser.error("--cache/--cache-dir cannot be used when reading the graph from stdin")
+    if args.backend == "dense" and args.algorithm not in DENSE_ALGORITHMS:
+        parser.error(f"--backend dense supports only: {', '.join(DENSE_ALGORITHMS)}")
+    if args.backend == "dense" and not numpy_available():
+        parser.error("--backend dense requires numpy: pip3 install numpy")
+    if args.order != "file" and (args.backend in ("dict", "dense") or args.mesh):
+        parser.error("--order applies to the csr and auto backends")
+    if args.reduce and (args.cache or args.mesh):
+        parser.error("--reduce cannot be combined with --cache/--cache-dir or --mesh")
+    if args.cut and args.backend == "dict" and not args.mesh:
+        parser.error("--cut needs the csr, dense or auto backend")
+    if args.reduce and args.algorithm == "planar_dual":
+        parser.error("planar_dual needs the mesh layout; --reduce changes it")
+    if args.cut and args.reduce and args.algorithm == "preflow_push_min_cut":
+        parser.error("--cut with --reduce needs a full flow; preflow_push_min_cut leaves a preflow")
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    if args.global_relabel_interval is not None and args.global_relabel_interval < 1:
+        parser.error("--global-relabel-interval must be at least 1")
+
     #Load Graph
-    graph = Graph(args.graph)
-
-     # Select and run algorithm
-    if args.algorithm == "ford_fulkerson":
-        max_flow = ford_fulkerson(graph, args.source, args.sink)
-    elif args.algorithm == "scaling_ford_fulkerson":
-        max_flow = scaling_max_flow(graph, args.source, args.sink)
-    elif args.algorithm == "preflow_push":
-        max_flow = preflow_push(graph, args.source, args.sink)
+    reduction = None
+    if args.mesh:
+        rows, cols, capacity = args.mesh
+        if args.mesh_random:
+            graph = MeshGraph.random(rows, cols, capacity, args.seed)
+        else:
+            graph = MeshGraph(rows, cols, capacity)
+    elif args.cache:
+        graph = load_cached_csr(args.graph, args.cache_dir, args.format, args.order)
+    elif args.backend == "csr" and not args.reduce:
+        graph = CSRGraph.from_file(args.graph, args.format, args.order)
+    elif args.backend == "dense" and not args.reduce:
+        graph = DenseGraph.from_file(args.graph, args.format)
+    elif args.backend == "dict" and not args.reduce:
+        graph = Graph(args.graph, args.format)
     else:
-        print(f"Error: Unknown algorithm '{args.algorithm}'", file=sys.stderr)
-        exit(1)
+        # Parse once, reduce and reorder if asked, then build the representation
+        labels, tails, heads, capacities, source, sink = read_graph_file(
+            args.graph, args.format
+        )
+        if args.source is None:
+            args.source = source if source is not None else "s"
+        if args.sink is None:
+            args.sink = sink if sink is not None else "t"
+        if args.reduce:
+            reduction = Reduction(labels, tails, heads, capacities, args.source, args.sink)
+            labels = reduction.labels
+            tails = reduction.tails
+            heads = reduction.heads
+            capacities = reduction.capacities
+        labels, tails, heads = reorder(labels, tails, heads, args.order, args.source)
+
+        if args.backend == "auto":
+            # Store the graph as a matrix if it is dense enough
+            dense = (
+                args.algorithm in DENSE_ALGORITHMS
+                and numpy_available()
+                and len(labels) <= DENSE_MAX_VERTICES
+                and edge_density(len(labels), len(tails)) >= args.dense_threshold
+            )
+            args.backend = "dense" if dense else "csr"
+        if args.backend == "dict":
+            graph = Graph()
+            graph.load_edges(labels, tails, heads, capacities)
+        elif args.backend == "dense":
+            graph = DenseGraph(labels, tails, heads, capacities)
+        else:
+            graph = CSRGraph(labels, tails, heads, capacities)
+        graph.source = source
+        graph.sink = sink
+
+    # Terminals: command line first, then the ones named by the file
+    if args.source is None:
+        args.source = graph.source if graph.source is not None else "s"
+    if args.sink is None:
+        args.sink = graph.sink if graph.sink is not None else "t"
+
+    # The solvers never modify the loaded graph. Except on the dict backend,
+    # one residual network is allocated here and reset by each solve.
+    solve_target = graph if isinstance(graph, Graph) else graph.residual_network()
+
+    # Push-relabel heuristics
+    push_relabel_options = {
+        "gap": not args.no_gap,
+        "global_relabel": not args.no_global_relabel,
+        "global_relabel_interval": args.global_relabel_interval,
+    }
+
+    # Select and run algorithm
+    # Solvers that count their work (e.g. augmentations) fill stats
+    solve_times = []
+    for _ in range(args.repeat):
+        stats = {}
+        start_time = time.perf_counter()
+        if args.algorithm == "ford_fulkerson":
+            max_flow = ford_fulkerson(solve_target, args.source, args.sink, stats)
+        elif args.algorithm == "scaling_ford_fulkerson":
+            max_flow = scaling_max_flow(solve_target, args.source, args.sink, stats)
+        elif args.algorithm == "preflow_push":
+            max_flow = preflow_push(
+                solve_target, args.source, args.sink, stats=stats, **push_relabel_options
+            )
+        elif args.algorithm == "preflow_push_fifo":
+            max_flow = preflow_push(
+                solve_target, args.source, args.sink, "fifo", stats=stats, **push_relabel_options
+            )
+        elif args.algorithm == "preflow_push_lowest":
+            max_flow = preflow_push(
+                solve_target, args.source, args.sink, "lowest", stats=stats, **push_relabel_options
+            )
+        elif args.algorithm == "preflow_push_excess_scaling":
+            max_flow = preflow_push(
+                solve_target,
+                args.source,
+                args.sink,
+                excess_scaling=True,
+                stats=stats,
+                **push_relabel_options,
+            )
+        elif args.algorithm == "preflow_push_min_cut":
+            max_flow = preflow_push(
+                solve_target,
+                args.source,
+                args.sink,
+                min_cut_only=True,
+                stats=stats,
+                **push_relabel_options,
+            )
+        elif args.algorithm == "dinic":
+            max_flow = dinic(solve_target, args.source, args.sink)
+        elif args.algorithm == "dynamic_tree_dinic":
+            max_flow = dynamic_tree_dinic(solve_target, args.source, args.sink)
+        elif args.algorithm == "isap":
+            max_flow = isap(solve_target, args.source, args.sink)
+        elif args.algorithm == "fattest_path":
+            max_flow = fattest_path(solve_target, args.source, args.sink, stats)
+        elif args.algorithm == "scaling_dinic":
+            max_flow = scaling_dinic(solve_target, args.source, args.sink, stats)
+        elif args.algorithm == "boykov_kolmogorov":
+            max_flow = boykov_kolmogorov(solve_target, args.source, args.sink, stats)
+        elif args.algorithm == "planar_dual":
+            # Finds the cut directly; the residual network is not used
+            try:
+                max_flow, planar_side = planar_dual_min_cut(solve_target, args.source, args.sink)
+            except ValueError as error:
+                print(f"Error: {error}", file=sys.stderr)
+                exit(1)
+        else:
+            print(f"Error: Unknown algorithm '{args.algorithm}'", file=sys.stderr)
+            exit(1)
+        solve_times.append(time.perf_counter() - start_time)
+
+    if args.cut:
+        # Map the flow back through the reduction, if any, to cut the original graph
+        if reduction is not None:
+            source_side = reduction.min_cut(reduction.edge_flows(solve_target.edge_flows()))
+        elif args.algorithm == "planar_dual":
+            source_side = planar_side
+        elif args.algorithm == "preflow_push_min_cut":
+            # Excess may be stranded on s's side, so cut off what still reaches t
+            source_side = solve_target.source_side_from_sink(solve_target.vertex_id(args.sink))
+        else:
+            source_side = solve_target.source_side(solve_target.vertex_id(args.source))
 
     if args.json:
         # JSON output mode for machine parsing
@@ -70,9 +370,23 @@ if __name__ == "__main__":
             "sink": args.sink,
             "graph_file": args.graph,
             "num_vertices": graph.get_num_vertices(),
-            "num_edges": graph.get_num_edges()
+            "num_edges": graph.get_num_edges(),
+            "solve_times": solve_times,
+            "backend": "mesh" if args.mesh else args.backend
         }
+        if args.mesh:
+            output["mesh"] = args.mesh
+        if stats:
+            output["stats"] = stats
+        if reduction is not None:
+            output["reduction"] = reduction.stats
+        if args.cut:
+            output["source_side"] = sorted(source_side)
         print(json.dumps(output))
     else:
         # Human-readable output mode
-        print("The maximum possible flow is:", max_flow)
\ No newline at end of file
+        print("The maximum possible flow is:", max_flow)
+        for name, value in stats.items():
+            print(f"{name.replace('_', ' ').capitalize()}: {value}")
+        if args.cut:
+            print(f"Source side of a minimum cut ({len(source_side)} vertices):", " ".join(sorted(source_side)))
\ No newline at end of file
@@ -0,0 +1,323 @@
+import random
+from array import array
+
+from csr_graph import CSRGraph, ResidualNetwork
+
+
+class MeshGraph:
+    def __init__(self, rows, cols, capacity=1):
+        # Implicit version of the graphs written by MeshGenerator.java: an
+        # rows x cols grid with edges s -> (i,1), (i,j) -> (i,j+1), both ways
+        # between vertically adjacent vertices and (i,cols) -> t. Nothing is
+        # stored per vertex or per arc; neighbors are computed arithmetically.
+        #
+        # Vertex ids: grid vertex (i,j) (1-based, as in the files) is
+        # (i - 1) * cols + (j - 1), then s = rows * cols and t = rows * cols + 1.
+        #
+        # Arc ids follow the CSR layout of CSRGraph, with every grid vertex u
+        # owning the four slots 4u .. 4u + 3:
+        #   4u + 0  right (to t in the last column)
+        #   4u + 1  left  (reverse arc of the edge into u from the left, or from s)
+        #   4u + 2  down  (unused on the last row)
+        #   4u + 3  up    (unused on the first row)
+        # followed by the rows arcs of s and the rows (reverse) arcs of t.
+        # Unused slots point back at u and have capacity 0.
+        #
+        # capacity is either one constant for every edge or a sequence with
+        # the capacity of every arc id (0 on reverse and unused slots).
+        if rows < 1 or cols < 1:
+            raise ValueError("A mesh needs at least one row and one column")
+        self.rows = rows
+        self.cols = cols
+        self.grid_size = rows * cols
+        self.num_vertices = self.grid_size + 2
+        self.num_arcs = 4 * self.grid_size + 2 * rows
+        self.num_edges = 2 * rows + rows * (cols - 1) + 2 * cols * (rows - 1)
+        self.source = "s"
+        self.sink = "t"
+
+        self.offsets = _ArcSequence(self._offset, self.num_vertices + 1)
+        self.heads = _ArcSequence(self._head, self.num_arcs)
+        self.rev = _ArcSequence(self._rev, self.num_arcs)
+        if isinstance(capacity, int):
+            self.constant_capacity = capacity
+            self.capacity = _ArcSequence(self._constant_capacity, self.num_arcs)
+        else:
+            if len(capacity) != self.num_arcs:
+                raise ValueError(
+                    f"Expected {self.num_arcs} arc capacities, got {len(capacity)}"
+                )
+            self.constant_capacity = None
+            self.capacity = capacity
+
+    @classmethod
+    def random(cls, rows, cols, max_capacity, seed=None):
+        """
+        Return a mesh whose edge capacities are drawn uniformly from
+        1..max_capacity, like MeshGenerator.java without '-cc'.
+        """
+        mesh = cls(rows, cols)
+        draw = random.Random(seed).randint
+        capacity = array("q", bytes(8 * mesh.num_arcs))
+        for a in range(mesh.num_arcs):
+            if mesh.capacity[a]:
+                capacity[a] = draw(1, max_capacity)
+        mesh.constant_capacity = None
+        mesh.capacity = capacity
+        return mesh
+
+    def _offset(self, u):
+        if u <= self.grid_size:
+            return 4 * u
+        return 4 * self.grid_size + self.rows * (u - self.grid_size)
+
+    def _head(self, a):
+        u, d = divmod(a, 4)
+        if u >= self.grid_size:
+            # Arcs of s lead to the first column, arcs of t to the last
+            r = a - 4 * self.grid_size
+            if r < self.rows:
+                return r * self.cols
+            return (r - self.rows) * self.cols + self.cols - 1
+        c = u % self.cols
+        if d == 0:
+            return u + 1 if c < self.cols - 1 else self.grid_size + 1
+        if d == 1:
+            return u - 1 if c > 0 else self.grid_size
+        if d == 2:
+            return u + self.cols if u + self.cols < self.grid_size else u
+        return u - self.cols if u >= self.cols else u
+
+    def _rev(self, a):
+        u, d = divmod(a, 4)
+        if u >= self.grid_size:
+            r = a - 4 * self.grid_size
+            if r < self.rows:
+                return 4 * r * self.cols + 1
+            return 4 * ((r - self.rows) * self.cols + self.cols - 1)
+        c = u % self.cols
+        if d == 0:
+            if c < self.cols - 1:
+                return 4 * (u + 1) + 1
+            return 4 * self.grid_size + self.rows + u // self.cols
+        if d == 1:
+            return 4 * (u - 1) if c > 0 else 4 * self.grid_size + u // self.cols
+        if d == 2:
+            return 4 * (u + self.cols) + 3 if u + self.cols < self.grid_size else a
+        return 4 * (u - self.cols) + 2 if u >= self.cols else a
+
+    def _constant_capacity(self, a):
+        u, d = divmod(a, 4)
+        if u >= self.grid_size:
+            return self.constant_capacity if a < 4 * self.grid_size + self.rows else 0
+        if d == 0:
+            return self.constant_capacity
+        if d == 1:
+            return 0
+        if d == 2:
+            return self.constant_capacity if u + self.cols < self.grid_size else 0
+        return self.constant_capacity if u >= self.cols else 0
+
+    def tail(self, a):
+        """Return the vertex arc a leaves."""
+        if a < 4 * self.grid_size:
+            return a >> 2
+        return self.grid_size if a < 4 * self.grid_size + self.rows else self.grid_size + 1
+
+    def capacity_array(self):
+        """Return a new int64 array holding the capacity of every arc."""
+        if self.constant_capacity is None:
+            return array("q", self.capacity)
+
+        c = self.constant_capacity
+        capacity = array("q", [c, 0, c, c]) * self.grid_size
+        for u in range(self.cols):
+            capacity[4 * u + 3] = 0  # no up edge on the first row
+            capacity[4 * (self.grid_size - 1 - u) + 2] = 0  # no down edge on the last row
+        capacity.extend(array("q", [c]) * self.rows)
+        capacity.extend(array("q", [0]) * self.rows)
+        return capacity
+
+    def label(self, v):
+        """Return the label of vertex id v, e.g. '(2,3)'."""
+        if v == self.grid_size:
+            return "s"
+        if v == self.grid_size + 1:
+            return "t"
+        r, c = divmod(v, self.cols)
+        return f"({r + 1},{c + 1})"
+
+    @property
+    def labels(self):
+        return [self.label(v) for v in range(self.num_vertices)]
+
+    def vertex_id(self, label):
+        """Return the integer id of a vertex label."""
+        if label == "s":
+            return self.grid_size
+        if label == "t":
+            return self.grid_size + 1
+        try:
+            r, c = map(int, label.strip("()").split(","))
+        except ValueError:
+            r = c = 0
+        if not (1 <= r <= self.rows and 1 <= c <= self.cols):
+            raise KeyError(f"Vertex '{label}' is not in the graph")
+        return (r - 1) * self.cols + (c - 1)
+
+    def edges(self):
+        """Yield (u, v, capacity) for every edge, in MeshGenerator.java file order."""
+        rows, cols = self.rows, self.cols
+        capacity = self.capacity
+        s = self.grid_size
+        for r in range(rows):
+            yield s, r * cols, capacity[4 * s + r]
+        for c in range(cols - 1):
+            for r in range(rows):
+                u = r * cols + c
+                yield u, u + 1, capacity[4 * u]
+        for c in range(cols):
+            for r in range(rows - 1):
+                u = r * cols + c
+                yield u, u + cols, capacity[4 * u + 2]
+                yield u + cols, u, capacity[4 * (u + cols) + 3]
+        for r in range(rows):
+            u = r * cols + cols - 1
+            yield u, s + 1, capacity[4 * u]
+
+    def to_csr(self):
+        """Return an explicit CSRGraph copy of this mesh."""
+        tails, heads, capacities = zip(*self.edges())
+        csr = CSRGraph(self.labels, tails, heads, capacities)
+        csr.source = self.source
+        csr.sink = self.sink
+        return csr
+
+    def residual_network(self):
+        """Return a new MeshResidualNetwork with every arc at its original capacity."""
+        return MeshResidualNetwork(self)
+
+    def get_num_vertices(self):
+        """Return the number of vertices in the graph."""
+        return self.num_vertices
+
+    def get_num_edges(self):
+        """Return the number of edges in the graph."""
+        return self.num_edges
+
+
+class _ArcSequence:
+    # Read-only sequence computing item i as func(i), so the arithmetic
+    # offsets/heads/rev of a MeshGraph index and slice like CSR arrays
+    __slots__ = ("func", "length")
+
+    def __init__(self, func, length):
+        self.func = func
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.func(j) for j in range(*i.indices(self.length))]
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError("arc index out of range")
+        return self.func(i)
+
+
+class MeshResidualNetwork(ResidualNetwork):
+    def __init__(self, graph):
+        # Residual capacities for a MeshGraph: one array entry per arc slot,
+        # the only per-arc storage a solve needs. BFS and augment walk the
+        # grid arithmetically instead of through offsets/heads/rev.
+        self.graph = graph
+        self.num_vertices = graph.num_vertices
+        self.offsets = graph.offsets
+        self.heads = graph.heads
+        self.rev = graph.rev
+        self.capacity = graph.capacity
+        self.residual = graph.capacity_array()
+
+    def reset(self):
+        """Restore every residual capacity to the original capacity, in place."""
+        self.residual[:] = self.graph.capacity_array()
+
+    def scaling_index(self):
+        """
+        Return self: the arithmetic BFS already beats indexing the computed
+        heads/rev by capacity bucket.
+        """
+        return self
+
+    def BFS(self, s, t, parent, capacity_threshold=1):
+        graph = self.graph
+        cols = graph.cols
+        grid_size = graph.grid_size
+        source = grid_size
+        sink = grid_size + 1
+        last_col = cols - 1
+        terminal_arcs = 4 * grid_size
+        rows = graph.rows
+        residual = self.residual
+
+        visited = bytearray(self.num_vertices)
+        visited[s] = 1
+        queue = [s]
+
+        for u in queue:
+            if u < grid_size:
+                a = 4 * u
+                c = u % cols
+                # right, left, down, up; unused slots have no residual capacity
+                # so their (out of range) neighbors are never looked at
+                for v in (
+                    u + 1 if c != last_col else sink,
+                    u - 1 if c else source,
+                    u + cols,
+                    u - cols,
+                ):
+                    if residual[a] >= capacity_threshold and not visited[v]:
+                        visited[v] = 1
+                        parent[v] = a
+                        if v == t:
+                            return True
+                        queue.append(v)
+                    a += 1
+            else:
+                a = terminal_arcs if u == source else terminal_arcs + rows
+                v = 0 if u == source else last_col
+                for _ in range(rows):
+                    if residual[a] >= capacity_threshold and not visited[v]:
+                        visited[v] = 1
+                        parent[v] = a
+                        if v == t:
+                            return True
+                        queue.append(v)
+                    a += 1
+                    v += cols
+        return False
+
+    def augment(self, s, t, parent):
+        """Push the bottleneck amount along the BFS path to t and return it."""
+        tail = self.graph.tail
+        rev = self.graph._rev
+        residual = self.residual
+
+        path_flow = float("Inf")
+        v = t
+        while v != s:
+            a = parent[v]
+            path_flow = min(path_flow, residual[a])
+            v = tail(a)
+
+        v = t
+        while v != s:
+            a = parent[v]
+            residual[a] -= path_flow
+            residual[rev(a)] += path_flow
+            v = tail(a)
+
+        return path_flow
@@ -0,0 +1,244 @@
+import heapq
+
+from csr_graph import CSRGraph, ResidualNetwork
+from mesh_graph import MeshGraph
+
+
+class MeshLayout:
+    def __init__(self, rows, cols, names):
+        # Edge capacities of an s-t planar mesh as drawn by MeshGenerator.java:
+        # a rows x cols grid, s left of the first column and t right of the
+        # last. Any subset of the grid edges, in either direction, is allowed.
+        #
+        # Horizontal edge slot j (0..cols) of row i joins column j to column
+        # j + 1, where column 0 is s and column cols + 1 is t: east[i * (cols
+        # + 1) + j] is the capacity towards t, west[...] the one back. down and
+        # up, at i * cols + c, are the two edges between (i, c) and (i + 1, c).
+        # names[i * cols + c] is the label of grid vertex (i, c) (0-based).
+        self.rows = rows
+        self.cols = cols
+        self.names = names
+        self.east = [0] * (rows * (cols + 1))
+        self.west = [0] * (rows * (cols + 1))
+        self.down = [0] * ((rows - 1) * cols)
+        self.up = [0] * ((rows - 1) * cols)
+
+    @classmethod
+    def detect(cls, graph, source, sink):
+        """
+        Return the MeshLayout of graph (a Graph, CSRGraph, MeshGraph or a
+        ResidualNetwork of one) with terminals source and sink. Raise
+        ValueError if the graph is not an s-t planar mesh.
+        """
+        if isinstance(graph, ResidualNetwork):
+            graph = graph.graph
+        if isinstance(graph, MeshGraph) and (source, sink) == ("s", "t"):
+            return cls.from_mesh(graph)
+
+        if isinstance(graph, CSRGraph):
+            labels = graph.labels
+            edges = (
+                (u, graph.heads[a], graph.capacity[a])
+                for u in range(graph.num_vertices)
+                for a in range(graph.offsets[u], graph.offsets[u + 1])
+            )
+        elif isinstance(graph, MeshGraph):
+            labels = graph.labels
+            edges = graph.edges()
+        else:
+            labels = list(graph.graph)
+            index = {label: i for i, label in enumerate(labels)}
+            edges = (
+                (index[u], index[v], c)
+                for u, adjacent in graph.graph.items()
+                for v, c in adjacent.items()
+            )
+
+        # Grid position of every vertex from its "(row,col)" label
+        position = [None] * len(labels)
+        rows = cols = 0
+        for v, label in enumerate(labels):
+            if label == source or label == sink:
+                continue
+            try:
+                r, c = map(int, label.strip("()").split(","))
+            except ValueError:
+                raise ValueError(f"Vertex '{label}' is not a (row,col) mesh vertex") from None
+            position[v] = (r - 1, c - 1)
+            rows = max(rows, r)
+            cols = max(cols, c)
+        if rows * cols + 2 != len(labels) or source not in labels or sink not in labels:
+            raise ValueError("The vertices do not form a complete rows x cols mesh")
+
+        names = [None] * (rows * cols)
+        for v, p in enumerate(position):
+            if p is not None:
+                names[p[0] * cols + p[1]] = labels[v]
+        layout = cls(rows, cols, names)
+        s = labels.index(source)
+        t = labels.index(sink)
+        width = cols + 1
+
+        for u, v, c in edges:
+            if c <= 0:
+                continue
+            pu = position[u]
+            pv = position[v]
+            if pu is None or pv is None:
+                # Terminal edges: s beside the first column, t beside the last
+                if u == s and pv is not None and pv[1] == 0:
+                    layout.east[pv[0] * width] += c
+                elif v == s and pu is not None and pu[1] == 0:
+                    layout.west[pu[0] * width] += c
+                elif v == t and pu is not None and pu[1] == cols - 1:
+                    layout.east[pu[0] * width + cols] += c
+                elif u == t and pv is not None and pv[1] == cols - 1:
+                    layout.west[pv[0] * width + cols] += c
+                else:
+                    raise ValueError(
+                        f"Edge {labels[u]} -> {labels[v]} does not fit an s-t planar mesh"
+                    )
+            elif pu[0] == pv[0] and pv[1] == pu[1] + 1:
+                layout.east[pu[0] * width + pv[1]] += c
+            elif pu[0] == pv[0] and pv[1] == pu[1] - 1:
+                layout.west[pu[0] * width + pu[1]] += c
+            elif pu[1] == pv[1] and pv[0] == pu[0] + 1:
+                layout.down[pu[0] * cols + pu[1]] += c
+            elif pu[1] == pv[1] and pv[0] == pu[0] - 1:
+                layout.up[pv[0] * cols + pv[1]] += c
+            else:
+                raise ValueError(
+                    f"Edge {labels[u]} -> {labels[v]} does not fit an s-t planar mesh"
+                )
+        return layout
+
+    @classmethod
+    def from_mesh(cls, mesh):
+        """Return the MeshLayout of a MeshGraph, read from its arc slots."""
+        rows, cols = mesh.rows, mesh.cols
+        layout = cls(rows, cols, [mesh.label(v) for v in range(mesh.grid_size)])
+        capacity = mesh.capacity_array()
+        width = cols + 1
+        for i in range(rows):
+            layout.east[i * width] = capacity[4 * mesh.grid_size + i]
+            for c in range(cols):
+                u = i * cols + c
+                layout.east[i * width + c + 1] = capacity[4 * u]
+                if i < rows - 1:
+                    layout.down[u] = capacity[4 * u + 2]
+                    layout.up[u] = capacity[4 * (u + cols) + 3]
+        return layout
+
+    def min_cut(self):
+        """
+        Return (value, source side) of a minimum s-t cut, where the source
+        side is the set of vertex labels on s's side, s itself excluded.
+
+        s and t split the outer face into a top and a bottom face, and every
+        s-t cut is a path of dual edges from the top face to the bottom one.
+        A dual step costs the capacity of the primal edge it crosses if that
+        edge then leads from s's side to t's side: heading south across
+        horizontal edges, s's side is to the west, so eastward edges count;
+        heading east across a vertical pair, s's side is to the south, so the
+        upward edge counts. Dijkstra over the (rows + 1) x (cols + 1) faces,
+        face (k, j) lying between grid rows k - 1 and k and between columns j
+        and j + 1, then finds the minimum cut in O(n log n).
+        """
+        rows, cols = self.rows, self.cols
+        width = cols + 1
+        east, west, down, up = self.east, self.west, self.down, self.up
+        inf = float("Inf")
+
+        # Row 0 of the faces is the top face, row rows the bottom face
+        dist = [inf] * ((rows + 1) * width)
+        crossed = [-1] * len(dist)  # face reached from, for the path back
+        heap = []
+        for j in range(width):
+            dist[j] = 0
+            heap.append((0, j))
+        goal = -1
+
+        while heap:
+            d, f = heapq.heappop(heap)
+            if d > dist[f]:
+                continue  # stale entry
+            k, j = divmod(f, width)
+            if k == rows:
+                goal = f
+                break
+
+            # South across row k's horizontal edge in slot j, and north
+            # across row k - 1's (never back into the top face)
+            steps = [(f + width, east[k * width + j])]
+            if k > 1:
+                steps.append((f - width, west[(k - 1) * width + j]))
+            if k > 0:
+                # East and west across the vertical pairs between rows k - 1
+                # and k, in grid columns j and j - 1
+                if j < cols:
+                    steps.append((f + 1, up[(k - 1) * cols + j]))
+                if j > 0:
+                    steps.append((f - 1, down[(k - 1) * cols + j - 1]))
+            for g, c in steps:
+                if d + c < dist[g]:
+                    dist[g] = d + c
+                    crossed[g] = f
+                    heapq.heappush(heap, (d + c, g))
+
+        # Block the primal edges under the dual path and collect what s still
+        # reaches across the rest of the grid
+        blocked_h = bytearray(rows * width)
+        blocked_v = bytearray(max(0, (rows - 1) * cols))
+        f = goal
+        while crossed[f] >= 0:
+            g = crossed[f]
+            k, j = divmod(max(f, g), width)
+            if abs(f - g) == width:
+                blocked_h[(k - 1) * width + j] = 1
+            else:
+                blocked_v[(k - 1) * cols + j - 1] = 1
+            f = g
+
+        side = bytearray(rows * cols)
+        queue = [i * cols for i in range(rows) if not blocked_h[i * width]]
+        for u in queue:
+            side[u] = 1
+        for u in queue:
+            i, c = divmod(u, cols)
+            neighbors = []
+            if c < cols - 1 and not blocked_h[i * width + c + 1]:
+                neighbors.append(u + 1)
+            if c > 0 and not blocked_h[i * width + c]:
+                neighbors.append(u - 1)
+            if i < rows - 1 and not blocked_v[u]:
+                neighbors.append(u + cols)
+            if i > 0 and not blocked_v[u - cols]:
+                neighbors.append(u - cols)
+            for v in neighbors:
+                if not side[v]:
+                    side[v] = 1
+                    queue.append(v)
+
+        return dist[goal], {self.names[u] for u in queue}
+
+
+def planar_dual_min_cut(graph, source, sink):
+    """
+    Return (max flow value, source side labels of a minimum cut) for an s-t
+    planar mesh, found as a shortest path in the planar dual instead of by
+    pushing flow. graph may be a Graph, a CSRGraph, a MeshGraph or a
+    ResidualNetwork of one (left untouched); a graph that is not laid out
+    like MeshGenerator.java's meshes raises ValueError.
+    """
+    if source == sink:
+        return 0, {source}  # no flow can leave and reach the same vertex
+    layout = MeshLayout.detect(graph, source, sink)
+    value, side = layout.min_cut()
+    side.add(source)
+    return value, side
+
+
+def planar_dual(graph, source, sink):
+    # Max flow value of an s-t planar mesh: the minimum cut is a shortest
+    # top-to-bottom path in the dual graph (see MeshLayout.min_cut)
+    return planar_dual_min_cut(graph, source, sink)[0]
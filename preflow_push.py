@@ -1,106 +1,340 @@
-from collections import defaultdict, deque
-
-
-def preflow_push_max_flow(capacity, source, sink):
-    # Collect all vertices that appear in the capacity graph
-    vertices = set(capacity.keys())
-    for u in capacity:
-        for v in capacity[u]:
-            vertices.add(v)
-    vertices = list(vertices)
-
-    # Track neighbors so we can check residual edges easily
-    neighbors = {u: set() for u in vertices}
-    for u in capacity:
-        for v in capacity[u]:
-            neighbors[u].add(v)
-            neighbors[v].add(u)
-
-    # Start with zero flow everywhere
-    flow = defaultdict(lambda: defaultdict(int))
-
-    # Height and excess are the main values used by Preflow-Push
-    height = {u: 0 for u in vertices}
-    excess = {u: 0 for u in vertices}
-
-    # Standard initialization: source starts with a large height
-    height[source] = len(vertices)
-
-    # Residual capacity helper
-    def residual(u, v):
-        cap = capacity.get(u, {}).get(v, 0)
-        return cap - flow[u][v]
-
-    # Initial push: send as much as possible out of the source
-    for v, c in capacity.get(source, {}).items():
-        flow[source][v] = c
-        flow[v][source] = -c
-        excess[v] += c
-        excess[source] -= c
-
-    # Active nodes = nodes with extra flow (except s and t)
-    active = deque(u for u in vertices if u not in (source, sink) and excess[u] > 0)
-
-    def push(u, v):
-        # Push whatever u can send through (u, v)
-        send = min(excess[u], residual(u, v))
-        if send <= 0:
+from collections import deque
+from csr_graph import as_residual_network
+
+# Order in which active vertices are discharged: highest height first (the
+# default, O(n^2 sqrt(m))), first in first out (O(n^3)), or lowest height first
+SELECTION_RULES = ["highest", "fifo", "lowest"]
+
+
+class ActiveVertices:
+    def __init__(self, rule, max_height):
+        # Active vertices waiting to be discharged. The height-based rules
+        # keep one bucket (list) per height, with a pointer to the highest or
+        # lowest bucket that may be non-empty; FIFO uses a queue.
+        if rule not in SELECTION_RULES:
+            raise ValueError(f"Unknown selection rule '{rule}'")
+        self.rule = rule
+        self.queue = deque()
+        self.buckets = [[] for _ in range(max_height + 1)]
+        self.top = 0
+        self.bottom = max_height
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, u, height):
+        """Add active vertex u, currently at the given height."""
+        self.size += 1
+        if self.rule == "fifo":
+            self.queue.append(u)
             return
+        self.buckets[height].append(u)
+        if height > self.top:
+            self.top = height
+        if height < self.bottom:
+            self.bottom = height
+
+    def pop(self):
+        """Remove and return the next vertex to discharge."""
+        self.size -= 1
+        if self.rule == "fifo":
+            return self.queue.popleft()
+        buckets = self.buckets
+        if self.rule == "highest":
+            while not buckets[self.top]:
+                self.top -= 1
+            return buckets[self.top].pop()
+        while not buckets[self.bottom]:
+            self.bottom += 1
+        return buckets[self.bottom].pop()
+
+
+def preflow_push(
+    graph,
+    source,
+    sink,
+    rule="highest",
+    gap=True,
+    global_relabel=True,
+    global_relabel_interval=None,
+    excess_scaling=False,
+    min_cut_only=False,
+    stats=None,
+):
+    # Preflow-Push on the residual arrays: each arc's residual capacity is
+    # stored once and linked to its reverse arc, and every vertex keeps a
+    # current-arc pointer into its arc range, so a discharge resumes where
+    # the last one stopped instead of rescanning all of u's arcs.
+    # graph may be a Graph, a CSRGraph or a ResidualNetwork (reset and reused).
+    # A dict-backed Graph is converted to CSR arrays first.
+    #
+    # rule selects the next active vertex to discharge (see SELECTION_RULES).
+    # gap and global_relabel toggle the heuristics, global_relabel_interval
+    # is the number of relabels between global relabels (default: the number
+    # of vertices), and a stats dict receives the relabel, gap and global
+    # relabel counts. excess_scaling replaces the selection rule with
+    # Ahuja-Orlin excess scaling (see scale_excess below).
+    #
+    # min_cut_only stops after phase one: vertices at height >= n cannot
+    # reach t any more, so they are not discharged and their excess is left
+    # where it is instead of being returned to s. excess[t] is then already
+    # the maximum flow value, but the residual arrays hold a preflow, not a
+    # flow: the minimum cut is given by the vertices that can still reach t
+    # (ResidualNetwork.source_side_from_sink), not by those s reaches.
+    network = as_residual_network(graph)
+    s = network.vertex_id(source)
+    t = network.vertex_id(sink)
+    if s == t:
+        return 0  # no flow can leave and reach the same vertex
+    n = network.num_vertices
+    offsets = network.offsets
+    heads = network.heads
+    rev = network.rev
+    residual = network.residual
+    unlabeled = 2 * n - 1
+    # Only vertices below this height are discharged
+    limit = n if min_cut_only else 2 * n
+
+    height = [0] * n
+    excess = [0] * n
+    height[s] = n
+
+    # Arcs before current[u] are not admissible until u is relabeled
+    current = list(offsets[:n])
+
+    # Initial push: saturate every arc leaving the source
+    for a in range(offsets[s], offsets[s + 1]):
+        c = residual[a]
+        if c > 0:
+            v = heads[a]
+            residual[a] = 0
+            residual[rev[a]] += c
+            excess[v] += c
+            excess[s] -= c
+
+    counters = {"relabels": 0, "gaps": 0, "global_relabels": 0}
+    if global_relabel_interval is None:
+        global_relabel_interval = n
+
+    # count[h] is the number of vertices at height h < n, and members[h] the
+    # vertices that were given height h (stale entries are skipped), so a gap
+    # lifts the vertices above it without scanning every vertex
+    count = [0] * n
+    members = [[] for _ in range(n)]
+    top = 0  # no vertex is above this height, among heights < n
+
+    def index_heights():
+        nonlocal top
+        for h in range(n):
+            count[h] = 0
+            members[h] = []
+        top = 0
+        for v in range(n):
+            h = height[v]
+            if h < n:
+                count[h] += 1
+                members[h].append(v)
+                if h > top:
+                    top = h
+
+    def find_active():
+        active = ActiveVertices(rule, 2 * n)
+        for u in range(n):
+            if u != s and u != t and excess[u] > 0 and height[u] < limit:
+                active.add(u, height[u])
+        return active
+
+    def relabel_all():
+        # Global relabel: reverse BFS from t for the exact distances to t,
+        # then from s (at n) for the vertices that can no longer reach t
+        for v in range(n):
+            height[v] = unlabeled
+        for root, base in ((t, 0), (s, n)):
+            height[root] = base
+            queue = [root]
+            for v in queue:
+                h = height[v] + 1
+                # An arc v -> u in v's range pairs with the arc u -> v into v
+                for b in range(offsets[v], offsets[v + 1]):
+                    u = heads[b]
+                    if height[u] == unlabeled and u != s and u != t and residual[rev[b]] > 0:
+                        height[u] = h
+                        queue.append(u)
+        index_heights()
+        current[:] = offsets[:n]
+        counters["global_relabels"] += 1
+
+    if global_relabel:
+        relabel_all()
+    else:
+        index_heights()
+    active = find_active()
+    relabels_since_global = 0
+
+    def push(u, a):
+        v = heads[a]
+        send = min(excess[u], residual[a])
         prev_excess_v = excess[v]
-        flow[u][v] += send
-        flow[v][u] -= send
+        residual[a] -= send
+        residual[rev[a]] += send
         excess[u] -= send
         excess[v] += send
 
-        # If v becomes active for the first time, add it to the queue
-        if v not in (source, sink) and prev_excess_v == 0 and excess[v] > 0:
-            active.append(v)
+        # If v becomes active for the first time, add it to the active set
+        if v != s and v != t and prev_excess_v == 0 and excess[v] > 0:
+            active.add(v, height[v])
+
+    def lift_above(h):
+        # Gap at height h: lift every vertex above it (and below n) to n
+        nonlocal top
+        for k in range(h + 1, top + 1):
+            for v in members[k]:
+                if height[v] == k:
+                    height[v] = n
+                    current[v] = offsets[v]
+            count[k] = 0
+            members[k] = []
+        members[h] = []
+        top = h - 1
+        counters["gaps"] += 1
 
     def relabel(u):
-        # Increase u's height so it can push somewhere
+        # Lift u to one above its lowest neighbor across a residual arc
+        nonlocal relabels_since_global, top
         min_height = None
-        for v in neighbors[u]:
-            if residual(u, v) > 0:
-                if min_height is None or height[v] < min_height:
-                    min_height = height[v]
-        if min_height is not None:
-            height[u] = min_height + 1
+        for a in range(offsets[u], offsets[u + 1]):
+            if residual[a] > 0:
+                h = height[heads[a]]
+                if min_height is None or h < min_height:
+                    min_height = h
+        if min_height is None:
+            return
+        counters["relabels"] += 1
+        relabels_since_global += 1
+
+        old = height[u]
+        new = min_height + 1
+        if old < n:
+            count[old] -= 1
+            if gap and count[old] == 0:
+                lift_above(old)
+                new = max(new, n)
+        height[u] = new
+        if new < n:
+            count[new] += 1
+            if gap:
+                members[new].append(u)
+            if new > top:
+                top = new
 
     def discharge(u):
-        # Keep trying to push flow out of u until it has no excess left
-        while excess[u] > 0:
-            pushed = False
-            for v in neighbors[u]:
-                if residual(u, v) > 0 and height[u] == height[v] + 1:
-                    push(u, v)
-                    pushed = True
-                    if excess[u] == 0:
-                        break
-            if not pushed:
-                # No valid push edges, so lift u
+        # Push along admissible arcs from the current arc on; once the arc
+        # range is exhausted no arc is admissible, so relabel and start over
+        a = current[u]
+        end = offsets[u + 1]
+        while excess[u] > 0 and height[u] < limit:
+            if a == end:
                 relabel(u)
+                a = offsets[u]
+            elif residual[a] > 0 and height[u] == height[heads[a]] + 1:
+                push(u, a)  # either saturates arc a or empties u
+            else:
+                a += 1
+        current[u] = a
 
-    # Main algorithm loop: process active nodes one at a time
-    while active:
-        u = active.popleft()
-        discharge(u)
+    # queued[u] is the height u had when it was added to the set of large
+    # excess vertices; gaps and global relabels may have lifted it since
+    queued = [0] * n
+
+    def find_large(delta):
+        large = ActiveVertices("lowest", 2 * n)
+        for u in range(n):
+            if u != s and u != t and 2 * excess[u] >= delta and height[u] < limit:
+                large.add(u, height[u])
+                queued[u] = height[u]
+        return large
 
-        # If the node still has extra flow, it stays active
-        if excess[u] > 0:
-            active.append(u)
+    def scale_excess():
+        # Excess scaling, O(nm + n^2 log U): in the phase for delta only
+        # vertices with excess >= delta / 2 are selected, lowest first, and a
+        # push never raises the excess of a vertex other than s and t above
+        # delta. Every push then either saturates its arc or moves at least
+        # delta / 2, which stops the long runs of tiny pushes. delta starts at
+        # the smallest power of two >= the largest capacity and is halved
+        # once no large excess is left.
+        nonlocal relabels_since_global
+        max_capacity = max(network.capacity, default=0)
+        delta = 1 << (max_capacity - 1).bit_length() if max_capacity > 0 else 0
+        counters["scaling_phases"] = 0
 
-    # Max flow sits in the sink's excess after all pushes finish
-    return excess[sink]
+        while delta >= 1:
+            counters["scaling_phases"] += 1
+            large = find_large(delta)
+            while large:
+                u = large.pop()
+                if height[u] >= limit:
+                    continue  # lifted out of reach of t (min_cut_only)
+                if queued[u] != height[u]:
+                    # Lifted since it was queued: requeue at its real height
+                    large.add(u, height[u])
+                    queued[u] = height[u]
+                    continue
+
+                # Push once along the current admissible arc, or relabel
+                a = current[u]
+                end = offsets[u + 1]
+                target = height[u] - 1
+                while a < end and (residual[a] == 0 or height[heads[a]] != target):
+                    a += 1
+                if a == end:
+                    relabel(u)
+                    current[u] = offsets[u]
+                else:
+                    current[u] = a
+                    v = heads[a]
+                    send = min(excess[u], residual[a])
+                    if v != s and v != t:
+                        # v is below u, so its excess is under delta / 2
+                        send = min(send, delta - excess[v])
+                    was_large = 2 * excess[v] >= delta
+                    residual[a] -= send
+                    residual[rev[a]] += send
+                    excess[u] -= send
+                    excess[v] += send
+                    if not was_large and v != s and v != t and 2 * excess[v] >= delta:
+                        large.add(v, height[v])
+                        queued[v] = height[v]
+
+                if 2 * excess[u] >= delta and height[u] < limit:
+                    large.add(u, height[u])
+                    queued[u] = height[u]
+
+                # Periodically restore exact heights
+                if global_relabel and relabels_since_global >= global_relabel_interval:
+                    relabel_all()
+                    large = find_large(delta)
+                    relabels_since_global = 0
+
+            delta //= 2
+
+    if excess_scaling:
+        scale_excess()
+        active = find_active()  # empty: the delta = 1 phase leaves no active vertex
+
+    while active:
+        u = active.pop()
+        discharge(u)
 
+        if excess[u] > 0 and height[u] < limit:
+            active.add(u, height[u])
 
-def preflow_push(graph, source, sink):
-    # Build a simple capacity dict from the Graph object
-    capacity = {}
-    for u in graph.graph:
-        capacity[u] = {}
-        for v, w in graph.graph[u].items():
-            c = int(w)
-            if c > 0:  # Only keep usable edges
-                capacity[u][v] = c
+        # Periodically restore exact heights
+        if global_relabel and relabels_since_global >= global_relabel_interval:
+            relabel_all()
+            active = find_active()
+            relabels_since_global = 0
 
-    return preflow_push_max_flow(capacity, source, sink)
+    if stats is not None:
+        stats.update(counters)
+    return excess[t]
@@ -1,8 +1,16 @@
 from graph import Graph
+from csr_graph import as_residual_network
+from dinic import blocking_flow, build_levels
 import math
 
 
-def scaling_max_flow(graph, source, sink):
+def scaling_max_flow(graph, source, sink, stats=None):
+    if not isinstance(graph, Graph):
+        return scaling_max_flow_csr(graph, source, sink, stats)
+
+    # Work on a copy so the loaded graph is left untouched and can be solved again.
+    # stats is only filled on the CSR path, which counts the arcs it scans.
+    graph = graph.copy()
 
     # Find the max_capacity in the edges outgoing from source
     max_capacity = 0
@@ -67,3 +75,75 @@ def scaling_max_flow(graph, source, sink):
 
     # Return f (max_flow)
     return max_flow
+
+
+def scaling_max_flow_csr(graph, source, sink, stats=None):
+    # graph may be a Graph, a CSRGraph or a ResidualNetwork (reset and reused)
+    # If stats is a dict, the number of arcs the searches scanned is stored in it.
+    network = as_residual_network(graph)
+    s = network.vertex_id(source)
+    t = network.vertex_id(sink)
+
+    # Find the max_capacity in the arcs outgoing from source
+    max_capacity = max(network.out_capacities(s), default=0)
+
+    # If there is no outgoing edge from source, return 0
+    if max_capacity == 0:
+        return 0
+
+    # Largest power of two not above max_capacity
+    delta = 2 ** math.floor(math.log2(max_capacity))
+
+    # Search through the network's scaling index (CapacityBuckets for CSR
+    # arrays), so each search skips the arcs below delta
+    index = network.scaling_index()
+    parent = [-1] * network.num_vertices
+    max_flow = 0
+
+    while delta >= 1:
+        # Augment along s-t paths whose arcs all have residual capacity >= delta
+        while index.BFS(s, t, parent, delta):
+            max_flow += index.augment(s, t, parent)
+
+        delta //= 2
+
+    if stats is not None and index is not network:
+        stats["arcs_scanned"] = index.arcs_scanned
+    return max_flow
+
+
+def scaling_dinic(graph, source, sink, stats=None):
+    # Capacity scaling with a Dinic blocking flow per augmentation round:
+    # within each delta phase, build the level graph of the arcs with
+    # residual capacity >= delta and saturate it, instead of restarting a
+    # BFS from s after every single path.
+    # graph may be a Graph, a CSRGraph or a ResidualNetwork (reset and reused).
+    # A dict-backed Graph is converted to CSR arrays first.
+    # If stats is a dict, the number of blocking flows is stored in it.
+    network = as_residual_network(graph)
+    s = network.vertex_id(source)
+    t = network.vertex_id(sink)
+    if s == t:
+        return 0  # no flow can leave and reach the same vertex
+
+    # Seed delta from the largest capacity of any arc, not just those leaving
+    # s, so no phase starts below the widest arc in the graph
+    max_capacity = max(network.capacity, default=0)
+    if max_capacity == 0:
+        return 0
+    delta = 2 ** math.floor(math.log2(max_capacity))
+
+    level = [-1] * network.num_vertices
+    max_flow = 0
+    blocking_flows = 0
+
+    while delta >= 1:
+        while build_levels(network, s, t, level, delta):
+            max_flow += blocking_flow(network, s, t, level, delta)
+            blocking_flows += 1
+
+        delta //= 2
+
+    if stats is not None:
+        stats["blocking_flows"] = blocking_flows
+    return max_flow
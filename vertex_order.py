@@ -0,0 +1,114 @@
+"""
+Vertex reordering
+
+Vertex ids are assigned in order of first appearance in the graph file, which
+scatters neighboring mesh cells and same-side bipartite vertices across the
+CSR arrays. These passes relabel the vertices before the arrays are built so
+that the arcs a search scans next tend to sit next to each other:
+
+    file  keep the file order (no reordering)
+    bfs   breadth-first order from the source
+    rcm   reverse Cuthill-McKee: BFS from a minimum-degree vertex of each
+          component, visiting neighbors by increasing degree, then reversed
+
+Both passes treat the edges as undirected. Labels travel with their vertices,
+so results are still reported with the original labels.
+"""
+
+from array import array
+
+ORDERS = ["file", "bfs", "rcm"]
+
+
+def _undirected_adjacency(num_vertices, tails, heads):
+    # CSR adjacency of the underlying undirected graph (duplicates are harmless)
+    degree = [0] * num_vertices
+    for u in tails:
+        degree[u] += 1
+    for v in heads:
+        degree[v] += 1
+
+    offsets = [0] * (num_vertices + 1)
+    for u in range(num_vertices):
+        offsets[u + 1] = offsets[u] + degree[u]
+
+    position = offsets[:num_vertices]
+    neighbors = array("i", bytes(4 * offsets[num_vertices]))
+    for u, v in zip(tails, heads):
+        neighbors[position[u]] = v
+        position[u] += 1
+        neighbors[position[v]] = u
+        position[v] += 1
+    return offsets, neighbors, degree
+
+
+def _bfs_sequence(num_vertices, offsets, neighbors, starts):
+    # Concatenated BFS orders, starting a new search at the next unvisited start
+    visited = bytearray(num_vertices)
+    order = []
+    for start in starts:
+        if visited[start]:
+            continue
+        visited[start] = 1
+        i = len(order)
+        order.append(start)
+        while i < len(order):
+            u = order[i]
+            i += 1
+            for v in neighbors[offsets[u] : offsets[u + 1]]:
+                if not visited[v]:
+                    visited[v] = 1
+                    order.append(v)
+    return order
+
+
+def vertex_order(num_vertices, tails, heads, method, start=0):
+    """
+    Return the vertex ids in their new order (order[new_id] = old_id).
+    start is where the bfs order begins (normally the source).
+    """
+    if method == "file":
+        return list(range(num_vertices))
+
+    offsets, neighbors, degree = _undirected_adjacency(num_vertices, tails, heads)
+
+    if method == "bfs":
+        starts = [start] if num_vertices else []
+        return _bfs_sequence(num_vertices, offsets, neighbors, starts + list(range(num_vertices)))
+
+    if method == "rcm":
+        # Visit each vertex's neighbors by increasing degree
+        key = degree.__getitem__
+        for u in range(num_vertices):
+            a, b = offsets[u], offsets[u + 1]
+            neighbors[a:b] = array("i", sorted(neighbors[a:b], key=key))
+        starts = sorted(range(num_vertices), key=key)
+        order = _bfs_sequence(num_vertices, offsets, neighbors, starts)
+        order.reverse()
+        return order
+
+    raise ValueError(f"Unknown vertex order '{method}'")
+
+
+def reorder(labels, tails, heads, method, start_label=None):
+    """
+    Relabel an edge list (as returned by read_graph_file) with the given
+    order method. Returns (labels, tails, heads) with the labels permuted to
+    match the new vertex ids; capacities keep their positions.
+    """
+    if method == "file":
+        return labels, tails, heads
+
+    labels = list(labels)
+    index = {label: i for i, label in enumerate(labels)}
+    start = index.get(start_label, 0)
+    order = vertex_order(len(labels), tails, heads, method, start)
+
+    new_id = [0] * len(labels)
+    for new, old in enumerate(order):
+        new_id[old] = new
+    return (
+        [labels[old] for old in order],
+        list(map(new_id.__getitem__, tails)),
+        list(map(new_id.__getitem__, heads)),
+    )